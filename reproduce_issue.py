@@ -3,7 +3,7 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.getcwd(), "src"))
 
-from nameu.core.filename_processor import get_unique_filename
+from nameu.core.filename_processor import get_unique_filenames
 
 def test():
     directory = "."
@@ -17,8 +17,7 @@ def test():
     ]
     
     with open("results.txt", "w", encoding="utf-8") as f:
-        for filename in cases:
-            result = get_unique_filename(directory, filename, artist_name)
+        for filename, result in zip(cases, get_unique_filenames(directory, cases, artist_name)):
             f.write(f"Original: {filename}\n")
             f.write(f"Result:   {result}\n\n")
 
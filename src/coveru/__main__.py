@@ -1,17 +1,18 @@
+import io
+import itertools
 import os
 import re
 import shlex
 import shutil
 import subprocess
+import threading
+import tomllib
 import zipfile
 from collections import deque
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path, PurePath
 
 from PIL import Image
-import pillow_avif
-import pillow_jxl
-import toml
 
 # Try to use rich for colored output; fallback to built-in print
 try:
@@ -73,9 +74,36 @@ DEFAULT_FORMAT = 'jxl'
 MAX_WORKERS = DEFAULT_MAX_WORKERS
 EXCLUDE_KEYWORDS = DEFAULT_EXCLUDE_KEYWORDS
 IMAGE_EXTS = tuple(DEFAULT_IMAGE_EXTENSIONS)
+# 不带点的小写扩展名集合，用于逐个文件名的快速判断
+IMAGE_EXT_NAMES = frozenset(ext[1:] for ext in IMAGE_EXTS)
 JXL_QUALITY = 45
-JXL_EFFORT = 7
+JXL_EFFORT = 5
 AVIF_QUALITY = 85
+JPEG_DRAFT_MAX_SIDE = 4096
+ZIP_SEARCH_DEPTH = 0
+# 从压缩包流式写出封面时的缓冲区大小
+COPY_BUFFER_SIZE = 1 << 20
+
+# 7z 可执行文件路径，只在导入时查找一次；未安装时跳过 7z 回退
+SEVEN_ZIP = shutil.which('7z')
+
+
+def _compile_keyword_pattern(keywords):
+    """将排除关键词编译为单个正则，关键词为空时返回 None。"""
+    keywords = [k for k in keywords if k]
+    if not keywords:
+        return None
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+
+EXCLUDE_PATTERN = _compile_keyword_pattern(EXCLUDE_KEYWORDS)
+
+# 大于 0 时使用该数量的子进程编码（适合 effort 较高的大批量任务），否则使用线程池
+ENCODE_PROCESSES = 0
+_ENCODE_POOL = None
+_ENCODE_POOL_LOCK = threading.Lock()
+# 编码队列上限：提取线程（I/O）领先编码线程（CPU）过多时阻塞等待
+_ENCODE_SLOTS = threading.BoundedSemaphore((os.cpu_count() or 1) * 2)
 
 
 def _normalize_extensions(exts):
@@ -158,20 +186,28 @@ def _flatten_folders(folders, recursive=False):
 
 
 def _process_folders_parallel(folders, convert_format, no_convert, max_workers):
-    futures = []
     total = len(folders)
     completed = 0
+    # 同时在途的任务数限制为 2*max_workers，避免一次性为所有文件夹创建 Future
+    max_in_flight = max_workers * 2
+    folder_iter = iter(folders)
+    pending = set()
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for folder in folders:
-            futures.append(executor.submit(process_folder, folder, convert_format, no_convert))
+        for folder in itertools.islice(folder_iter, max_in_flight):
+            pending.add(executor.submit(process_folder, folder, convert_format, no_convert))
 
-        for future in as_completed(futures):
-            completed += 1
-            try:
-                future.result()
-                cprint(f"[并发] {completed}/{total} 个文件夹处理完成", style="green")
-            except Exception as exc:
-                cprint(f"并发任务失败: {exc}", style="bold red")
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                completed += 1
+                try:
+                    future.result()
+                    cprint(f"[并发] {completed}/{total} 个文件夹处理完成", style="green")
+                except Exception as exc:
+                    cprint(f"并发任务失败: {exc}", style="bold red")
+
+            for folder in itertools.islice(folder_iter, len(done)):
+                pending.add(executor.submit(process_folder, folder, convert_format, no_convert))
 
 
 def _render_path_instructions():
@@ -203,43 +239,101 @@ def _iter_subdirectories(folder):
         return
 
 
-def get_largest_zip(folder_path):
+def _scan_folder(folder):
+    """
+    对文件夹执行一次 os.scandir，返回 (子目录路径列表, 文件 DirEntry 列表, 符号链接子目录路径集合)。
+    图片检测、最大压缩包查找和子目录遍历共用这一次扫描结果。
+    子目录列表包含指向目录的符号链接（与 _flatten_folders 一致，仍会作为子文件夹处理），
+    另行记录以便 _iter_zip_files 递归查找压缩包时不进入它们。
+    """
+    subdirs = []
+    files = []
+    linked = set()
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+                    if entry.is_symlink():
+                        linked.add(entry.path)
+                elif entry.is_file():
+                    files.append(entry)
+    except OSError:
+        pass
+    return subdirs, files, linked
+
+
+def _iter_zip_files(folder_path, scan=None, prune=None):
+    """
+    递归产出 (zip路径, 文件大小)，只对 .zip 文件读取 stat。scan 为顶层的 _scan_folder 结果。
+    跳过隐藏/特殊目录（如 .git），ZIP_SEARCH_DEPTH > 0 时只向下搜索指定层数。
+    prune 为可选的 prune(目录路径) -> bool，在目录即将被读取时调用，返回 True 则跳过整个子树。
+    """
+    max_depth = ZIP_SEARCH_DEPTH
+    stack = [(folder_path, 0)]
+    if scan is not None:
+        subdirs, files, linked = scan
+        # 与下面的递归遍历一致，不进入指向目录的符号链接
+        stack = [(sub, 1) for sub in subdirs
+                 if sub not in linked and not _should_skip_folder(os.path.basename(sub))]
+        for entry in files:
+            if entry.name.lower().endswith('.zip'):
+                yield entry.path, entry.stat().st_size
+    while stack:
+        current, depth = stack.pop()
+        if max_depth and depth > max_depth:
+            continue
+        if prune is not None and prune(current):
+            continue
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not _should_skip_folder(entry.name):
+                            stack.append((entry.path, depth + 1))
+                    elif entry.name.lower().endswith('.zip') and entry.is_file():
+                        yield entry.path, entry.stat().st_size
+        except OSError:
+            continue
+
+
+def get_largest_zip(folder_path, scan=None):
     """
     找到文件夹中最大的 .zip 文件。
     优先选择路径中不包含'画集'或'合刊'关键词的文件。
 
     参数:
     folder_path (str): 要搜索的文件夹路径。
+    scan (tuple): 可选，folder_path 的 _scan_folder 结果，避免重复读取顶层目录。
 
     返回:
     str: 最大的 .zip 文件的路径，如果未找到则返回 None。
     """
-    global EXCLUDE_KEYWORDS
-    exclude_keywords = EXCLUDE_KEYWORDS
+    global EXCLUDE_PATTERN
+    exclude_pattern = EXCLUDE_PATTERN
     largest_size = 0
     largest_zip = None
     largest_size_excluded = 0
     largest_zip_excluded = None
-    
-    for root, dirs, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith('.zip'):
-                file_path = os.path.join(root, file)
-                size = os.path.getsize(file_path)
-                
-                # 检查路径中是否包含排除关键词
-                contains_excluded_keyword = any(keyword in file_path for keyword in exclude_keywords)
-                
-                if not contains_excluded_keyword:
-                    # 优先选择不包含排除关键词的文件
-                    if size > largest_size:
-                        largest_size = size
-                        largest_zip = file_path
-                else:
-                    # 记录包含排除关键词的最大文件作为备用
-                    if size > largest_size_excluded:
-                        largest_size_excluded = size
-                        largest_zip_excluded = file_path
+
+    def prune(dir_path):
+        # 已有不含关键词的候选时，路径含关键词的目录下只可能是备用文件，整棵子树无需再读取
+        return largest_zip is not None and exclude_pattern.search(dir_path) is not None
+
+    for file_path, size in _iter_zip_files(folder_path, scan, prune if exclude_pattern is not None else None):
+        # 检查路径中是否包含排除关键词
+        contains_excluded_keyword = exclude_pattern is not None and exclude_pattern.search(file_path) is not None
+        
+        if not contains_excluded_keyword:
+            # 优先选择不包含排除关键词的文件
+            if size > largest_size:
+                largest_size = size
+                largest_zip = file_path
+        else:
+            # 记录包含排除关键词的最大文件作为备用
+            if size > largest_size_excluded:
+                largest_size_excluded = size
+                largest_zip_excluded = file_path
     
     # 如果没有找到不包含排除关键词的文件，则使用包含关键词的文件
     if largest_zip is None and largest_zip_excluded is not None:
@@ -248,6 +342,135 @@ def get_largest_zip(folder_path):
     
     return largest_zip
 
+def _init_encode_process(settings):
+    """编码子进程初始化：同步主进程加载的编码设置。"""
+    globals().update(settings)
+
+
+def _get_encode_pool():
+    """
+    获取图片编码池（首次调用时创建）。Pillow 的 JXL/AVIF 编码在 C 层释放 GIL，默认使用线程池；
+    ENCODE_PROCESSES > 0 时改用进程池，避开剩余的 GIL 竞争。
+    """
+    global _ENCODE_POOL
+    with _ENCODE_POOL_LOCK:
+        if _ENCODE_POOL is None:
+            if ENCODE_PROCESSES > 0:
+                settings = {
+                    'JXL_QUALITY': JXL_QUALITY,
+                    'JXL_EFFORT': JXL_EFFORT,
+                    'AVIF_QUALITY': AVIF_QUALITY,
+                    'JPEG_DRAFT_MAX_SIDE': JPEG_DRAFT_MAX_SIDE,
+                }
+                _ENCODE_POOL = ProcessPoolExecutor(
+                    max_workers=ENCODE_PROCESSES,
+                    initializer=_init_encode_process,
+                    initargs=(settings,),
+                )
+            else:
+                _ENCODE_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='encode')
+        return _ENCODE_POOL
+
+
+def _submit_encode(convert_func, *args):
+    """
+    将编码任务提交到编码线程池，队列已满时阻塞提交方。
+    提取（I/O）与编码（CPU）分属两个线程池，通过有界队列衔接。
+    """
+    _ENCODE_SLOTS.acquire()
+    try:
+        future = _get_encode_pool().submit(convert_func, *args)
+    except BaseException:
+        _ENCODE_SLOTS.release()
+        raise
+    future.add_done_callback(lambda _: _ENCODE_SLOTS.release())
+    return future
+
+
+def _apply_jpeg_draft(img):
+    """
+    对长边超过 JPEG_DRAFT_MAX_SIDE 的 JPEG 启用 draft 模式，
+    让解码器按 1/2、1/4、1/8 直接缩小解码（长边仍不小于阈值）。阈值为 0 时不处理。
+    """
+    max_side = JPEG_DRAFT_MAX_SIDE
+    if not max_side or img.format != 'JPEG':
+        return
+    width, height = img.size
+    long_side = max(width, height)
+    if long_side <= max_side:
+        return
+    scale = max_side / long_side
+    img.draft('RGB', (max(1, round(width * scale)), max(1, round(height * scale))))
+
+
+def _normalize_image_mode(img, convert_format):
+    """
+    有透明通道的图片转换为 RGBA，其余转换为 RGB；灰度图（L，JXL 下还有 LA）保持原模式。
+    模式已经被编码器支持时直接返回原图，避免一次整图复制。
+    """
+    keep_modes = ('RGB', 'RGBA', 'L', 'LA') if convert_format == 'jxl' else ('RGB', 'RGBA', 'L')
+    if img.mode in keep_modes:
+        return img
+    if img.mode in ('LA', 'RGBa', 'La', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+        return img.convert('RGBA')
+    return img.convert('RGB')
+
+
+def _save_encoded(img, output_path, convert_format):
+    """按目标格式（jxl/avif）和全局质量设置编码并保存图片。"""
+    _apply_jpeg_draft(img)
+    img = _normalize_image_mode(img, convert_format)
+    # 编码插件按需导入，只加载本次用到的编解码库
+    if convert_format == 'jxl':
+        import pillow_jxl  # noqa: F401
+        # 保存为JXL格式，使用较高的质量设置
+        img.save(output_path, format='JXL', quality=JXL_QUALITY, effort=JXL_EFFORT)
+    else:
+        import pillow_avif  # noqa: F401
+        # 保存为AVIF格式，使用较高的质量设置
+        img.save(output_path, format='AVIF', quality=AVIF_QUALITY)
+
+
+def _write_cover(src, cover_path):
+    """
+    以 COPY_BUFFER_SIZE 为块，把文件对象中的封面流式写入 cover_path。
+
+    返回:
+    bool: 是否写入成功；失败时已输出错误信息。
+    """
+    try:
+        with open(cover_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+    except OSError as e:
+        cprint(f"写入封面失败: {e}", style="bold red")
+        return False
+    cprint(f"已写入封面: {cover_path}", style="green")
+    return True
+
+
+def encode_cover_bytes(data, cover_path, convert_format):
+    """
+    直接从内存中的图片数据编码封面，省去先落盘再读回、删除的往返。
+
+    参数:
+    data (bytes): 原始图片数据。
+    cover_path (str): 原格式封面路径，输出文件仅替换扩展名。
+    convert_format (str): 转换的目标格式，'jxl' 或 'avif'。
+
+    返回:
+    str | None: 写入的封面路径；编码失败时按原格式写入 cover_path，写入也失败时返回 None。
+    """
+    output_path = str(PurePath(cover_path).with_suffix(f'.{convert_format}'))
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            _save_encoded(img, output_path, convert_format)
+        cprint(f"已转换为{convert_format.upper()}: {os.path.basename(output_path)}", style="green")
+        return output_path
+    except Exception as e:
+        cprint(f"转换失败: {cover_path}，错误: {str(e)}", style="bold red")
+        return cover_path if _write_cover(io.BytesIO(data), cover_path) else None
+
+
 def convert_to_jxl(image_path):
     """
     使用 Pillow 将图片转换为JXL格式。
@@ -258,21 +481,11 @@ def convert_to_jxl(image_path):
     返回:
     str: 转换后的JXL图片路径。
     """
-    output_path = os.path.splitext(image_path)[0] + '.jxl'
+    output_path = str(PurePath(image_path).with_suffix('.jxl'))
     try:
         # 使用 Pillow 打开并转换图片
         with Image.open(image_path) as img:
-            # 如果图片有透明通道，保持透明度
-            if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-                # 对于有透明度的图片，保持原模式或转换为RGBA
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-            else:
-                # 对于不透明图片，转换为RGB
-                img = img.convert('RGB')
-
-            # 保存为JXL格式，使用较高的质量设置
-            img.save(output_path, format='JXL', quality=JXL_QUALITY, effort=JXL_EFFORT)
+            _save_encoded(img, output_path, 'jxl')
 
         # 转换成功后删除原图
         os.remove(image_path)
@@ -292,21 +505,11 @@ def convert_to_avif(image_path):
     返回:
     str: 转换后的AVIF图片路径。
     """
-    output_path = os.path.splitext(image_path)[0] + '.avif'
+    output_path = str(PurePath(image_path).with_suffix('.avif'))
     try:
         # 使用 Pillow 打开并转换图片
         with Image.open(image_path) as img:
-            # 如果图片有透明通道，保持透明度
-            if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-                # 对于有透明度的图片，保持原模式或转换为RGBA
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-            else:
-                # 对于不透明图片，转换为RGB
-                img = img.convert('RGB')
-
-            # 保存为AVIF格式，使用较高的质量设置
-            img.save(output_path, format='AVIF', quality=AVIF_QUALITY)
+            _save_encoded(img, output_path, 'avif')
 
         # 转换成功后删除原图
         os.remove(image_path)
@@ -326,139 +529,168 @@ def extract_first_image_from_zip(zip_path, destination_folder, convert_format='j
     destination_folder (str): 图片提取的目标文件夹路径。
     convert_format (str): 转换的目标格式，'jxl' 或 'avif'。
     no_convert (bool): 是否跳过格式转换。
+
+    返回:
+    Future | None: 需要转换时返回编码任务的 Future，否则返回 None。
     """
     global IMAGE_EXTS
-    # 首先尝试使用 7z（性能/兼容路径更好），失败时回退到 Python 的 zipfile
+    # 首先使用 zipfile 在进程内读取中央目录，无法读取时再回退到 7z
     image_exts = IMAGE_EXTS
     first_image = None
     extracted_path = None
+    data = None
+    folder_name = os.path.basename(destination_folder)
+    needs_convert = not no_convert and convert_format in SUPPORTED_CONVERT_FORMATS
 
     try:
-        # 使用7z列出压缩包中的文件
+        with zipfile.ZipFile(zip_path, 'r') as zf:
+            # 过滤出图片文件，取文件名排序后的第一张（单次遍历，无需完整排序）
+            first_image = min((n for n in zf.namelist() if n.lower().endswith(image_exts)), default=None)
+            if first_image is None:
+                # 无图片，直接返回
+                return None
+
+            # 只取文件扩展名，直接以 (#cover)(文件夹名) 命名写入目标文件夹（防止路径穿越或目录结构）
+            ext = PurePath(first_image).suffix
+            cover_path = os.path.join(destination_folder, f"(#cover)({folder_name}){ext}")
+            if needs_convert and ext.lower() not in ['.jxl', '.avif']:
+                # 封面通常只有几 MB，一次读入内存后交给编码线程池，只写一次最终文件
+                data = zf.read(first_image)
+            else:
+                # 无需转换时直接流式写入最终文件，不在内存中保留整张图片
+                with zf.open(first_image) as src:
+                    _write_cover(src, cover_path)
+                return None
+    except Exception:
+        # zipfile 无法处理（不支持的压缩方法、损坏的中央目录等），回退到 7z
+        data = None
+
+    if data is not None:
+        cprint(f"正在将图片转换为{convert_format.upper()}: {cover_path}", style="cyan")
+        return _submit_encode(encode_cover_bytes, data, cover_path, convert_format)
+
+    # zipfile 未能读取时使用 7z 回退
+    if SEVEN_ZIP is None:
+        cprint(f"无法处理压缩包: {zip_path}", style="bold red")
+        return None
+    try:
+        # 使用7z技术列表模式列出压缩包中的文件，直接按字节解析，只解码命中的文件名
         result = subprocess.run(
-            ['7z', 'l', zip_path],
+            [SEVEN_ZIP, 'l', '-slt', '-sccUTF-8', zip_path],
             capture_output=True,
-            text=True,
-            encoding='gbk',
-            errors='ignore',
             check=True
         )
 
-        # 查找图片文件
+        # 查找图片文件（"----------" 之前是压缩包自身的信息）
+        image_exts_bytes = tuple(ext.encode('utf-8') for ext in image_exts)
         image_files = []
-        for line in result.stdout.splitlines():
-            if line.strip() and not line.startswith('-') and not line.startswith('Date'):
-                parts = line.split()
-                if len(parts) >= 6:
-                    filename = parts[-1]
-                    if filename.lower().endswith(image_exts):
-                        image_files.append(filename)
-
-        if image_files:
-            image_files.sort()
-            first_image = image_files[0]
-
-            # 使用7z提取第一张图片
-            subprocess.run(
-                ['7z', 'e', zip_path, first_image, f"-o{destination_folder}"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=True
-            )
-
-            extracted_path = os.path.join(destination_folder, os.path.basename(first_image))
-
-            # 如果提取后文件不存在，触发后续回退逻辑
-            if not os.path.exists(extracted_path):
-                extracted_path = None
+        _, _, entries = result.stdout.partition(b'\n----------')
+        for line in entries.splitlines():
+            if line.startswith(b'Path = '):
+                name = line[7:].rstrip(b'\r')
+                if name.lower().endswith(image_exts_bytes):
+                    image_files.append(name.decode('utf-8', errors='ignore'))
+
+        if not image_files:
+            # 无图片，直接返回
+            return None
+        first_image = min(image_files)
+
+        # 使用7z提取第一张图片
+        subprocess.run(
+            [SEVEN_ZIP, 'e', zip_path, first_image, f"-o{destination_folder}"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True
+        )
 
+        extracted_path = os.path.join(destination_folder, os.path.basename(first_image))
     except (subprocess.CalledProcessError, FileNotFoundError):
-        # 7z 不可用或调用失败，回退到 zipfile
         extracted_path = None
 
-    # 如果 7z 未能获取到文件路径，则使用 zipfile 回退
-    if extracted_path is None:
-        try:
-            with zipfile.ZipFile(zip_path, 'r') as zf:
-                # 过滤出图片文件
-                candidates = [n for n in zf.namelist() if n.lower().endswith(image_exts)]
-                if not candidates:
-                    # 无图片，直接返回
-                    return
-                candidates.sort()
-                first_image = candidates[0]
-
-                # 安全提取为目标文件夹的 basename（防止路径穿越或目录结构）
-                original_basename = os.path.basename(first_image)
-                target_path = os.path.join(destination_folder, original_basename)
-
-                # 读取并写入到目标文件
-                with zf.open(first_image) as src, open(target_path, 'wb') as dst:
-                    shutil.copyfileobj(src, dst)
-
-                extracted_path = target_path
-        except Exception:
-            cprint(f"无法处理压缩包: {zip_path}", style="bold red")
-            return
+    if extracted_path is None or not os.path.exists(extracted_path):
+        cprint(f"无法处理压缩包: {zip_path}", style="bold red")
+        return None
 
     # 到这里 extracted_path 已存在且指向提取出的文件
     if extracted_path and os.path.exists(extracted_path):
-        # 获取一级文件夹名称作为前缀
-        folder_name = os.path.basename(destination_folder)
-        original_filename = os.path.basename(extracted_path)
-        name, ext = os.path.splitext(original_filename)
+        extracted = PurePath(extracted_path)
+        ext = extracted.suffix
 
         # 添加前缀 (#cover)(文件夹名)
-        new_filename = f"(#cover)({folder_name}){ext}"
-        final_path = os.path.join(destination_folder, new_filename)
+        final_path = str(extracted.with_name(f"(#cover)({folder_name}){ext}"))
 
-        # 如果目标文件已经存在，选择覆盖
+        # 如果目标文件已经存在，选择覆盖（同目录内重命名，一次原子替换）
         try:
-            if os.path.exists(final_path):
-                os.remove(final_path)
-            shutil.move(extracted_path, final_path)
+            os.replace(extracted_path, final_path)
             cprint(f"已写入封面: {final_path}", style="green")
         except Exception as e:
             cprint(f"移动提取文件失败: {e}", style="bold red")
             return
 
-        # 检查提取的图片是否需要转换
-        ext = Path(final_path).suffix.lower()
+        # 检查提取的图片是否需要转换；编码交给独立线程池，调用方继续处理下一个文件夹
+        ext = ext.lower()
         if not no_convert and convert_format != ORIGINAL_FORMAT_TOKEN and ext not in ['.jxl', '.avif']:
             if convert_format == 'jxl':
                 cprint(f"正在将图片转换为JXL: {final_path}", style="cyan")
-                final_path = convert_to_jxl(final_path)
+                return _submit_encode(convert_to_jxl, final_path)
             elif convert_format == 'avif':
                 cprint(f"正在将图片转换为AVIF: {final_path}", style="cyan")
-                final_path = convert_to_avif(final_path)
+                return _submit_encode(convert_to_avif, final_path)
+    return None
+
+def _has_image(files):
+    """
+    判断 _scan_folder 得到的文件列表中是否包含图片文件或已生成的封面文件。
+    """
+    global IMAGE_EXT_NAMES
+    image_ext_names = IMAGE_EXT_NAMES
+    for entry in files:
+        name = entry.name
+        # 如果已经有脚本生成的封面文件，认为文件夹已包含图片
+        if '(#cover)(' in name:
+            return True
+        # 检查扩展名
+        dot = name.rfind('.')
+        if dot > 0 and name[dot + 1:].lower() in image_ext_names:
+            return True
+    return False
 
 def folder_contains_image(folder_path):
     """
     判断文件夹（仅当前层级）是否包含图片文件或已生成的封面文件。
-    返回 True/False。
+    返回 True/False。读取目录失败时返回 False 以便上层能够尝试后续处理。
     """
-    global IMAGE_EXTS
-    from pathlib import Path as _P
-    image_exts = set(IMAGE_EXTS)
-    try:
-        with os.scandir(folder_path) as it:
-            for entry in it:
-                # 只检测常规文件（忽略子目录）
-                if not entry.is_file():
-                    continue
-                name = entry.name
-                # 如果已经有脚本生成的封面文件，认为文件夹已包含图片
-                if '(#cover)(' in name:
-                    return True
-                # 检查扩展名
-                if _P(name).suffix.lower() in image_exts:
-                    return True
-    except Exception:
-        # 读取目录失败时，返回 False 以便上层能够尝试后续处理
-        return False
-    return False
+    return _has_image(_scan_folder(folder_path)[1])
+
+def _process_one(folder_path, convert_format='jxl', no_convert=False, scan=None):
+    """
+    处理单个文件夹（仅当前层级）：不包含图片时从最大的 .zip 文件中提取封面。
+
+    参数:
+    folder_path (str): 需要处理的文件夹路径。
+    convert_format (str): 转换的目标格式，'jxl' 或 'avif'。
+    no_convert (bool): 是否跳过格式转换。
+    scan (tuple): 可选，folder_path 的 _scan_folder 结果。
+
+    返回:
+    Future | None: 提交的编码任务，无需编码时返回 None。
+    """
+    if scan is None:
+        scan = _scan_folder(folder_path)
+    # 检查当前文件夹是否包含图片
+    if _has_image(scan[1]):
+        print(f"{folder_path} 包含图片，无需处理")
+        return None
+
+    largest_zip = get_largest_zip(folder_path, scan)
+    if not largest_zip:
+        print(f"在 {folder_path} 中未找到压缩包")
+        return None
+    return extract_first_image_from_zip(largest_zip, folder_path, convert_format, no_convert)
+
 
-def process_folder(root_folder, convert_format='jxl', no_convert=False):
+def process_folder(root_folder, convert_format='jxl', no_convert=False, pending_encodes=None, max_workers=1):
     """
     处理文件夹，如果子文件夹中没有图片，则从最大的 .zip 文件中提取第一张图片。
 
@@ -466,40 +698,56 @@ def process_folder(root_folder, convert_format='jxl', no_convert=False):
     root_folder (str): 需要处理的根文件夹路径。
     convert_format (str): 转换的目标格式，'jxl' 或 'avif'。
     no_convert (bool): 是否跳过格式转换。
-    """    # 检查一级文件夹本身
+    pending_encodes (list): 可选，由调用方收集并等待编码任务；未提供时在返回前等待本文件夹的编码完成。
+    max_workers (int): 并发处理子文件夹的线程数，1 表示逐个处理。
+    """
+    wait_encodes = pending_encodes is None
+    if wait_encodes:
+        pending_encodes = []
+    root_subdirs = []
+
+    # 检查一级文件夹本身
     if os.path.isdir(root_folder):
+        root_scan = _scan_folder(root_folder)
+        root_subdirs = root_scan[0]
         folder_name = os.path.basename(root_folder)
         if not _should_skip_folder(folder_name):
-            # 检查当前文件夹是否包含图片
-            contains_image = folder_contains_image(root_folder)
-
-            if not contains_image:
-                largest_zip = get_largest_zip(root_folder)
-                if largest_zip:
-                    extract_first_image_from_zip(largest_zip, root_folder, convert_format, no_convert)
-                else:
-                    print(f"在 {root_folder} 中未找到压缩包")            
-            else:
-                print(f"{root_folder} 包含图片，无需处理")
+            pending = _process_one(root_folder, convert_format, no_convert, root_scan)
+            if pending is not None:
+                pending_encodes.append(pending)
         else:
             print(f"跳过隐藏文件夹或特殊目录: {root_folder}")
 
     # 检查子文件夹
-    for sub_folder_path in _iter_subdirectories(root_folder):
-        sub_folder = os.path.basename(sub_folder_path)
-        if _should_skip_folder(sub_folder):
+    sub_folders = []
+    for sub_folder_path in root_subdirs:
+        if _should_skip_folder(os.path.basename(sub_folder_path)):
             print(f"跳过隐藏文件夹或特殊目录: {sub_folder_path}")
-            continue
-
-        contains_image = folder_contains_image(sub_folder_path)
-        if not contains_image:
-            largest_zip = get_largest_zip(sub_folder_path)
-            if largest_zip:
-                extract_first_image_from_zip(largest_zip, sub_folder_path, convert_format, no_convert)
-            else:
-                print(f"在 {sub_folder_path} 中未找到压缩包")
         else:
-            print(f"{sub_folder_path} 包含图片，无需处理")
+            sub_folders.append(sub_folder_path)
+
+    if max_workers > 1 and len(sub_folders) > 1:
+        # 各子文件夹互不依赖：扫描和解压并发进行，编码仍交给编码池
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(sub_folders))) as executor:
+            futures = [executor.submit(_process_one, path, convert_format, no_convert) for path in sub_folders]
+            for future in futures:
+                try:
+                    pending = future.result()
+                except Exception as exc:
+                    cprint(f"处理子文件夹失败: {exc}", style="bold red")
+                    continue
+                if pending is not None:
+                    pending_encodes.append(pending)
+    else:
+        for sub_folder_path in sub_folders:
+            pending = _process_one(sub_folder_path, convert_format, no_convert)
+            if pending is not None:
+                pending_encodes.append(pending)
+
+    # 等待本次提交的编码任务完成
+    if wait_encodes:
+        for pending in pending_encodes:
+            pending.result()
 
 
 def get_folders_from_user():
@@ -579,8 +827,8 @@ def main():
     # 加载配置
     config_path = Path(__file__).parent / "config.toml"
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = toml.load(f)
+        with open(config_path, 'rb') as f:
+            config = tomllib.load(f)
     except FileNotFoundError:
         print(f"配置文件 {config_path} 未找到，使用默认配置")
         config = {
@@ -589,24 +837,31 @@ def main():
                 'exclude_keywords': DEFAULT_EXCLUDE_KEYWORDS,
                 'image_extensions': DEFAULT_IMAGE_EXTENSIONS,
                 'max_workers': DEFAULT_MAX_WORKERS,
+                'zip_search_depth': 0,
             },
-            'jxl': {'quality': 45, 'effort': 7},
+            'jxl': {'quality': 45, 'effort': 5},
+            'jpeg': {'draft_max_side': 4096},
             'avif': {'quality': 85}
         }
     
     general_cfg = config.get('general', {})
     jxl_cfg = config.get('jxl', {})
     avif_cfg = config.get('avif', {})
+    jpeg_cfg = config.get('jpeg', {})
 
     # 设置全局配置变量
-    global EXCLUDE_KEYWORDS, IMAGE_EXTS, DEFAULT_FORMAT, JXL_QUALITY, JXL_EFFORT, AVIF_QUALITY, MAX_WORKERS
+    global EXCLUDE_KEYWORDS, EXCLUDE_PATTERN, IMAGE_EXTS, IMAGE_EXT_NAMES, DEFAULT_FORMAT, JXL_QUALITY, JXL_EFFORT, AVIF_QUALITY, MAX_WORKERS, JPEG_DRAFT_MAX_SIDE, ZIP_SEARCH_DEPTH, ENCODE_PROCESSES
     EXCLUDE_KEYWORDS = general_cfg.get('exclude_keywords', DEFAULT_EXCLUDE_KEYWORDS)
+    EXCLUDE_PATTERN = _compile_keyword_pattern(EXCLUDE_KEYWORDS)
     IMAGE_EXTS = _normalize_extensions(general_cfg.get('image_extensions', DEFAULT_IMAGE_EXTENSIONS))
+    IMAGE_EXT_NAMES = frozenset(ext[1:] for ext in IMAGE_EXTS)
     DEFAULT_FORMAT = general_cfg.get('default_format', 'jxl')
     MAX_WORKERS = general_cfg.get('max_workers', DEFAULT_MAX_WORKERS)
+    ZIP_SEARCH_DEPTH = general_cfg.get('zip_search_depth', 0)
     JXL_QUALITY = jxl_cfg.get('quality', 45)
-    JXL_EFFORT = jxl_cfg.get('effort', 7)
+    JXL_EFFORT = jxl_cfg.get('effort', 5)
     AVIF_QUALITY = avif_cfg.get('quality', 85)
+    JPEG_DRAFT_MAX_SIDE = jpeg_cfg.get('draft_max_side', 4096)
     
     # 创建命令行参数解析器
     parser = argparse.ArgumentParser(description='处理文件夹中的ZIP文件并提取封面图片')
@@ -615,8 +870,17 @@ def main():
     parser.add_argument('--no-convert', action='store_true', help='不转换图片格式')
     parser.add_argument('--format', choices=VALID_FORMAT_CHOICES, default=None, help='转换图片的目标格式；支持 jxl/avif/o (保持原格式)，未提供时将交互选择 (默认: 配置)')
     parser.add_argument('--max-workers', type=int, default=None, help='并发处理的最大线程数 (默认配置或 4)')
+    parser.add_argument('--encode-procs', type=int, default=0, help='使用多少个子进程编码图片，0 表示使用线程池 (默认: 0)')
+    parser.add_argument('--jxl-effort', type=int, choices=range(1, 10), default=None, metavar='1-9', help='JXL 编码强度，越大越慢、体积略小 (默认配置或 5)')
 
     args = parser.parse_args()
+    if args.jxl_effort is not None:
+        JXL_EFFORT = args.jxl_effort
+    ENCODE_PROCESSES = max(0, args.encode_procs)
+    if ENCODE_PROCESSES > 0:
+        # 在启动任何线程之前拉起编码子进程：fork 时若有其他线程持有导入锁，
+        # 子进程按需导入编码插件会死锁
+        _get_encode_pool().submit(int).result()
     
     # 如果没有提供文件夹路径，则提示用户输入
     if not args.folders:
@@ -658,11 +922,15 @@ def main():
         cprint(f"使用并发处理: {max_workers} 个线程", style="cyan")
         _process_folders_parallel(valid_folders, target_format, args.no_convert, max_workers)
     else:
-        # 处理每个有效的文件夹
+        # 处理每个有效的文件夹；子文件夹按 max_workers 并发处理，
+        # 编码在后台线程池中进行，下一个文件夹的扫描无需等待上一个的编码
+        pending_encodes = []
         for folder in valid_folders:
             print(f"\n开始处理文件夹: {folder}")
-            process_folder(folder, target_format, args.no_convert)
+            process_folder(folder, target_format, args.no_convert, pending_encodes, max_workers)
             print(f"完成处理文件夹: {folder}")
+        for pending in pending_encodes:
+            pending.result()
     
     print("\n所有文件夹处理完毕！")
 
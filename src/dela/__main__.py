@@ -2,9 +2,12 @@ import subprocess
 import os
 import sys
 import json
+import sqlite3
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import fnmatch
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
@@ -23,40 +26,81 @@ try:
 except ImportError:
     # 如果导入失败，提供简化版本
     class ArchiveHandler:
+        @staticmethod
+        def _list_archive_entries(archive_path: str) -> Tuple[Tuple[str, bool], ...]:
+            """列出压缩包内容，压缩包未修改时复用上次的7z结果
+
+            Returns:
+                Tuple[Tuple[str, bool], ...]: ((压缩包内路径, 是否为文件夹), ...)
+            """
+            st = os.stat(archive_path)
+            return _cached_archive_entries(os.path.abspath(archive_path), st.st_mtime_ns, st.st_size)
+
         @staticmethod
         def _analyze_folder_structure(archive_path: str) -> str:
             """分析压缩包的文件夹结构"""
             try:
-                result = subprocess.run(
-                    ['7z', 'l', archive_path],
-                    capture_output=True,
-                    text=True,
-                    encoding='gbk',
-                    errors='ignore',
-                    check=True
-                )
                 root_items = set()
-                for line in result.stdout.splitlines():
-                    if line.strip() and not line.startswith('-') and not line.startswith('Date'):
-                        parts = line.split()
-                        if len(parts) >= 6:
-                            name = parts[-1]
-                            if '/' in name or '\\' in name:
-                                root_items.add(name.split('/')[0].split('\\')[0])
-                            else:
-                                root_items.add('')
-
-                if '' in root_items:
-                    return "no_folder" if len(root_items) == 1 else "multiple_folders"
-                elif len(root_items) == 1:
-                    return "single_folder"
-                else:
-                    return "multiple_folders"
+                for name, is_dir in ArchiveHandler._list_archive_entries(archive_path):
+                    i = name.find('/')
+                    j = name.find('\\')
+                    k = i if j < 0 else (j if i < 0 else min(i, j))
+                    if k >= 0:
+                        root_items.add(name[:k])
+                    elif is_dir:
+                        root_items.add(name)
+                    else:
+                        root_items.add('')
+                    # 根目录已出现两项即可确定为多文件夹结构
+                    if len(root_items) > 1:
+                        return "multiple_folders"
+
+                if not root_items or '' in root_items:
+                    return "no_folder"
+                return "single_folder"
             except Exception:
                 return "no_folder"
 
+    @lru_cache(maxsize=4096)
+    def _cached_archive_entries(archive_path: str, mtime_ns: int, size: int) -> Tuple[Tuple[str, bool], ...]:
+        """以 (路径, 修改时间, 大小) 为键缓存7z技术列表(-slt)的解析结果"""
+        result = subprocess.run(
+            ['7z', 'l', '-slt', '-sccUTF-8', archive_path],
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='ignore',
+            check=True
+        )
+
+        entries = []
+        in_entries = False  # "----------" 之前是压缩包自身的信息
+        path = None
+        for line in result.stdout.splitlines():
+            if not in_entries:
+                in_entries = line == '----------'
+            elif line.startswith('Path = '):
+                if path is not None:
+                    entries.append((path, False))
+                path = line[7:]
+            elif path is not None and (line == 'Folder = +' or
+                                       (line.startswith('Attributes = ') and line[13:14] == 'D')):
+                entries.append((path, True))
+                path = None
+        if path is not None:
+            entries.append((path, False))
+        return tuple(entries)
+
 console = Console()
 
+# 需要删除的根目录文件类型
+TARGET_EXTENSIONS = ('.json', '.log', '.txt', '.yaml')
+
+# 压缩包检查结果的持久缓存
+CHECK_CACHE_PATH = Path.home() / ".cache" / "dela" / "archives.sqlite"
+# 检查逻辑或目标文件类型变化时，旧缓存行因版本不同而失效；修改检查逻辑时需递增前面的序号
+CHECK_CACHE_VERSION = f"1:{','.join(TARGET_EXTENSIONS)}"
+
 def load_config() -> Dict[str, Any]:
     """加载配置文件"""
     config_path = Path(__file__).parent / "config.json"
@@ -72,10 +116,33 @@ def load_config() -> Dict[str, Any]:
         console.print(f"[red]加载配置文件失败: {e}[/red]")
         sys.exit(1)
 
+def _iter_files(folder):
+    """用os.scandir递归遍历目录，逐个产出普通文件的DirEntry（folder为bytes时产出bytes路径）"""
+    stack = [folder]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry
+        except OSError:
+            continue
+
 def find_archives(folder: str, config: Dict[str, Any]) -> List[str]:
     """查找压缩包文件"""
     archives = []
     archive_types = tuple(config.get('archive_types', ['.zip', '.7z', '.rar']))
+    # POSIX 下以 bytes 遍历，文件名不逐个解码，只解码命中的压缩包路径；
+    # Windows 的文件系统接口本身就是 str，保持 str 遍历
+    use_bytes = os.name != 'nt'
+    if use_bytes:
+        root = os.fsencode(folder)
+        archive_types = tuple(os.fsencode(ext) for ext in archive_types)
+    else:
+        root = folder
 
     with Progress(
         SpinnerColumn(),
@@ -84,11 +151,14 @@ def find_archives(folder: str, config: Dict[str, Any]) -> List[str]:
     ) as progress:
         task = progress.add_task("搜索压缩包文件...", total=None)
 
-        for root, dirs, files in os.walk(folder):
-            for name in files:
-                if name.lower().endswith(archive_types):
-                    archives.append(os.path.join(root, name))
-                    progress.update(task, description=f"找到 {len(archives)} 个压缩包...")
+        for scanned, entry in enumerate(_iter_files(root), 1):
+            if entry.name.lower().endswith(archive_types):
+                archives.append(os.fsdecode(entry.path) if use_bytes else entry.path)
+            # 每扫描256个文件刷新一次进度，避免逐个文件重绘
+            if scanned % 256 == 0:
+                progress.update(task, description=f"找到 {len(archives)} 个压缩包...")
+
+        progress.update(task, description=f"找到 {len(archives)} 个压缩包...")
 
     return archives
 
@@ -99,40 +169,27 @@ def check_archive_conditions(archive_path: str) -> tuple:
         tuple: (是否符合条件, 结构类型, 根目录文件列表)
     """
     try:
-        # 1. 分析文件夹结构
+        # 1. 列出压缩包内容；_analyze_folder_structure 会把列表失败当作 "no_folder"，
+        #    这里先单独列出一次，失败时返回 "error"（结果不会写入持久缓存）
+        entries = ArchiveHandler._list_archive_entries(archive_path)
+
+        # 2. 分析文件夹结构（复用上面已缓存的列表结果）
         structure = ArchiveHandler._analyze_folder_structure(archive_path)
 
-        # 2. 只处理单文件夹结构
+        # 3. 只处理单文件夹结构
         if structure != "single_folder":
             return False, structure, []
 
-        # 3. 检查根目录是否有目标文件
+        # 4. 检查根目录是否有目标文件
         root_files = []
-        target_extensions = ['.json', '.log', '.txt', '.yaml']
-
-        try:
-            result = subprocess.run(
-                ['7z', 'l', archive_path],
-                capture_output=True,
-                text=True,
-                encoding='gbk',
-                errors='ignore',
-                check=True
-            )
-            for line in result.stdout.splitlines():
-                if line.strip() and not line.startswith('-') and not line.startswith('Date'):
-                    parts = line.split()
-                    if len(parts) >= 6:
-                        name = parts[-1]
-                        # 只检查根目录文件（不包含路径分隔符）
-                        if '/' not in name and '\\' not in name:
-                            file_ext = Path(name).suffix.lower()
-                            if file_ext in target_extensions:
-                                root_files.append(name)
-        except subprocess.CalledProcessError:
-            pass
-
-        # 4. 只有根目录存在目标文件才符合条件
+        for name, is_dir in entries:
+            # 只检查根目录文件（不包含路径分隔符）
+            if not is_dir and '/' not in name and '\\' not in name:
+                file_ext = Path(name).suffix.lower()
+                if file_ext in TARGET_EXTENSIONS:
+                    root_files.append(name)
+
+        # 5. 只有根目录存在目标文件才符合条件
         return len(root_files) > 0, structure, root_files
 
     except Exception as e:
@@ -140,6 +197,85 @@ def check_archive_conditions(archive_path: str) -> tuple:
         return False, "error", []
 
 
+def _open_check_cache() -> Optional[sqlite3.Connection]:
+    """打开检查结果缓存库，无法创建时返回None（本次不使用缓存）"""
+    try:
+        CHECK_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(CHECK_CACHE_PATH)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(checks)")]
+        if columns and 'version' not in columns:
+            # 旧版本的缓存表没有版本列，直接重建
+            conn.execute("DROP TABLE checks")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS checks ("
+            "path TEXT PRIMARY KEY, version TEXT, mtime_ns INTEGER, size INTEGER, structure TEXT, root_files TEXT)"
+        )
+        return conn
+    except (OSError, sqlite3.Error):
+        return None
+
+def check_archives(archives: List[str]) -> List[tuple]:
+    """并发检查所有压缩包是否符合删除条件
+
+    检查的耗时主要是等待7z列出压缩包，多个7z进程并发运行；确认和删除仍由调用方逐个进行。
+    结果按 (路径, 缓存版本, 修改时间, 大小) 缓存到 CHECK_CACHE_PATH，压缩包未变化时再次运行无需调用7z。
+
+    Returns:
+        List[tuple]: 与archives顺序一致的check_archive_conditions结果
+    """
+    results = [None] * len(archives)
+    max_workers = min(32, (os.cpu_count() or 1) * 2)
+    cache = _open_check_cache()
+    cache_keys = {}  # 需要重新检查的压缩包: 下标 -> (绝对路径, 缓存版本, mtime_ns, size)
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        TextColumn("{task.completed}/{task.total}"),
+        console=console
+    ) as progress:
+        task = progress.add_task("检查压缩包结构...", total=len(archives))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for idx, archive in enumerate(archives):
+                if cache is not None:
+                    try:
+                        st = os.stat(archive)
+                        key = (os.path.abspath(archive), CHECK_CACHE_VERSION, st.st_mtime_ns, st.st_size)
+                        row = cache.execute(
+                            "SELECT structure, root_files FROM checks "
+                            "WHERE path=? AND version=? AND mtime_ns=? AND size=?", key
+                        ).fetchone()
+                    except (OSError, sqlite3.Error):
+                        key, row = None, None
+                    if row is not None:
+                        structure, root_files = row[0], json.loads(row[1])
+                        results[idx] = (structure == "single_folder" and len(root_files) > 0, structure, root_files)
+                        progress.advance(task)
+                        continue
+                    if key is not None:
+                        cache_keys[idx] = key
+                futures[executor.submit(check_archive_conditions, archive)] = idx
+
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                progress.advance(task)
+
+    if cache is not None:
+        # 检查出错（包括7z无法列出压缩包）的结果不缓存，下次重新检查
+        rows = [(*key, results[idx][1], json.dumps(results[idx][2], ensure_ascii=False))
+                for idx, key in cache_keys.items() if results[idx][1] != "error"]
+        try:
+            with cache:
+                cache.executemany("INSERT OR REPLACE INTO checks VALUES (?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error:
+            pass
+        finally:
+            cache.close()
+
+    return results
+
 def should_delete_file(filename: str, config: Dict[str, Any]) -> bool:
     """判断文件是否应该被删除"""
     delete_patterns = config.get('delete_patterns', {})
@@ -184,7 +320,10 @@ def list_files_in_archive(archive: str, config: Dict[str, Any]) -> List[str]:
         return []
 
 def delete_files_in_archive(archive: str, files: List[str]) -> Dict[str, int]:
-    """删除压缩包中的文件"""
+    """删除压缩包中的文件
+
+    所有文件合并为一次7z调用，压缩包只重写一次；批量删除失败时再逐个删除，以便统计成功/失败数
+    """
     results = {"success": 0, "failed": 0}
 
     with Progress(
@@ -194,9 +333,23 @@ def delete_files_in_archive(archive: str, files: List[str]) -> Dict[str, int]:
     ) as progress:
         task = progress.add_task("删除文件中...", total=len(files))
 
+        if files:
+            try:
+                # "--" 之后的参数都按文件名处理，避免以"-"开头的文件名被当作开关
+                subprocess.run(['7z', 'd', archive, '--', *files],
+                             check=True,
+                             capture_output=True)
+                for fname in files:
+                    console.print(f"  [green]✓[/green] 删除: {fname}")
+                results["success"] = len(files)
+                progress.advance(task, len(files))
+                return results
+            except subprocess.CalledProcessError:
+                pass
+
         for fname in files:
             try:
-                subprocess.run(['7z', 'd', archive, fname],
+                subprocess.run(['7z', 'd', archive, '--', fname],
                              check=True,
                              capture_output=True)
                 console.print(f"  [green]✓[/green] 删除: {fname}")
@@ -265,13 +418,15 @@ def main():
     total_failed = 0
     processed_archives = 0
 
+    # 并发检查压缩包是否符合删除条件
+    check_results = check_archives(archives)
+
     # 处理每个压缩包
-    for idx, archive in enumerate(archives, 1):
+    for idx, (archive, check_result) in enumerate(zip(archives, check_results), 1):
         console.print(f"\n[bold cyan]处理压缩包 [{idx}/{len(archives)}][/bold cyan]")
         console.print(f"文件: {archive}")
 
-        # 检查压缩包是否符合删除条件
-        meets_conditions, structure, root_files = check_archive_conditions(archive)
+        meets_conditions, structure, root_files = check_result
 
         console.print(f"  结构类型: {structure}")
         if root_files:
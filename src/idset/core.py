@@ -2,10 +2,14 @@
 IDSet核心模块 - 使用SQLModel的极简实现
 """
 
-from sqlmodel import SQLModel, Field, create_engine, Session, select
+import re
+
+from sqlalchemy import event, column, literal_column, table, Column, DateTime, String
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Field, create_engine, Session, select, func
 from nanoid import generate
 from datetime import datetime
-from typing import Set, Dict, Any, Optional
+from typing import Set, Dict, Any, Optional, List
 
 
 def new_id() -> str:
@@ -13,6 +17,56 @@ def new_id() -> str:
     return generate()
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """每个新连接启用WAL日志，提交时不再每次fsync整个数据库"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+# 与 records 同步的全文索引（trigram 分词），find 的子串查询可以走索引而非全表扫描
+_FTS_DDL = (
+    """CREATE VIRTUAL TABLE records_fts USING fts5(
+        file_name, artist, content='records', content_rowid='rowid', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS records_ai AFTER INSERT ON records BEGIN
+        INSERT INTO records_fts(rowid, file_name, artist) VALUES (new.rowid, new.file_name, new.artist);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS records_ad AFTER DELETE ON records BEGIN
+        INSERT INTO records_fts(records_fts, rowid, file_name, artist)
+        VALUES ('delete', old.rowid, old.file_name, old.artist);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS records_au AFTER UPDATE ON records BEGIN
+        INSERT INTO records_fts(records_fts, rowid, file_name, artist)
+        VALUES ('delete', old.rowid, old.file_name, old.artist);
+        INSERT INTO records_fts(rowid, file_name, artist) VALUES (new.rowid, new.file_name, new.artist);
+    END""",
+    # 为建表前已有的记录建立索引
+    "INSERT INTO records_fts(records_fts) VALUES ('rebuild')",
+)
+
+_LIKE_WILDCARDS = re.compile(r"[%_]")
+
+
+def _fts_searchable(term: str) -> bool:
+    """判断子串能否走 trigram 索引
+
+    trigram 索引至少需要连续3个字符；少于3个字符的非ASCII片段在索引上匹配不到任何记录，需回退普通LIKE
+    """
+    parts = [part for part in _LIKE_WILDCARDS.split(term) if part]
+    return (any(len(part) >= 3 for part in parts)
+            and all(len(part) >= 3 or part.isascii() for part in parts))
+
+
+_records_fts = table(
+    "records_fts",
+    column("rowid"),
+    column("file_name", String),
+    column("artist", String),
+)
+
+
 class Record(SQLModel, table=True):
     """记录模型"""
     __tablename__ = "records"
@@ -20,7 +74,9 @@ class Record(SQLModel, table=True):
     uuid: str = Field(primary_key=True, default_factory=generate, max_length=21)
     file_name: Optional[str] = Field(default=None, max_length=512, index=True)
     artist: Optional[str] = Field(default=None, max_length=256, index=True)
-    created_time: datetime = Field(default_factory=datetime.now, index=True)
+    # 显式使用普通 DateTime 列：保持原先按本地时间存储的不带时区时间，
+    # 新版 sqlmodel 默认的 datetime 列类型会拒绝不带时区的值
+    created_time: datetime = Field(default_factory=datetime.now, sa_column=Column(DateTime, nullable=False, index=True))
 
 
 class IDSet:
@@ -29,8 +85,24 @@ class IDSet:
     def __init__(self, db_path: str = "ids.db"):
         """初始化"""
         db_url = f"sqlite:///{db_path}"
-        self.engine = create_engine(db_url)
+        self.engine = create_engine(db_url, connect_args={"check_same_thread": False})
+        event.listen(self.engine, "connect", _set_sqlite_pragmas)
         SQLModel.metadata.create_all(self.engine)
+        self.use_fts = self._init_fts()
+
+    def _init_fts(self) -> bool:
+        """创建全文索引表和同步触发器，SQLite 不支持 FTS5/trigram 时返回 False"""
+        try:
+            with self.engine.begin() as conn:
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='records_fts'"
+                ).first()
+                if not exists:
+                    for ddl in _FTS_DDL:
+                        conn.exec_driver_sql(ddl)
+            return True
+        except OperationalError:
+            return False
     
     def add(self, file_name: str = "", artist: str = "", **kwargs) -> str:
         """添加记录"""
@@ -43,6 +115,22 @@ class IDSet:
             session.commit()
             session.refresh(record)
             return record.uuid
+
+    def add_many(self, items: List[Dict[str, Any]]) -> List[str]:
+        """批量添加记录，所有记录在同一个事务中提交"""
+        records = [
+            Record(
+                file_name=item.get("file_name") or None,
+                artist=item.get("artist") or None
+            )
+            for item in items
+        ]
+        with Session(self.engine) as session:
+            session.add_all(records)
+            # uuid 在构造时已生成，提交后无需逐条 refresh
+            uuids = [record.uuid for record in records]
+            session.commit()
+            return uuids
     
     def get(self, uuid: str) -> Optional[Dict[str, Any]]:
         """获取记录"""
@@ -62,11 +150,21 @@ class IDSet:
         with Session(self.engine) as session:
             statement = select(Record)
 
-            if file_name:
-                statement = statement.where(Record.file_name.contains(file_name))
-
-            if artist:
-                statement = statement.where(Record.artist.contains(artist))
+            terms = [term for term in (file_name, artist) if term]
+            if self.use_fts and terms and all(_fts_searchable(term) for term in terms):
+                # 在全文索引上做同样的 LIKE 子串匹配，再按 rowid 取回记录
+                matched = select(_records_fts.c.rowid)
+                if file_name:
+                    matched = matched.where(_records_fts.c.file_name.contains(file_name))
+                if artist:
+                    matched = matched.where(_records_fts.c.artist.contains(artist))
+                statement = statement.where(literal_column("records.rowid").in_(matched))
+            else:
+                if file_name:
+                    statement = statement.where(Record.file_name.contains(file_name))
+
+                if artist:
+                    statement = statement.where(Record.artist.contains(artist))
 
             records = session.exec(statement).all()
 
@@ -115,6 +213,5 @@ class IDSet:
     def count(self) -> int:
         """记录总数"""
         with Session(self.engine) as session:
-            statement = select(Record)
-            results = session.exec(statement).all()
-            return len(results)
+            statement = select(func.count()).select_from(Record)
+            return session.exec(statement).one()
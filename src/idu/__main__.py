@@ -1,7 +1,6 @@
 import os
 import sys
 import argparse
-import pyperclip
 import subprocess
 from pathlib import Path
 
@@ -18,7 +17,7 @@ sys.path.append(parent_dir)
 
 from textual_preset import create_config_app
 from textual_logger import TextualLoggerManager
-from idu.core.archive_processor import ArchiveProcessor
+from idu.core.archive_processor import ArchiveProcessor, ARCHIVE_EXTENSIONS
 from idu.core.uuid_record_manager import UuidRecordManager
 from idu.core.path_handler import PathHandler
 from loguru import logger
@@ -75,7 +74,9 @@ def setup_logger(app_name="app", project_root=None, console_output=True):
         compression="zip",
         # encoding="utf-8",
         format="{time:YYYY-MM-DD HH:mm:ss} | {elapsed} | {level.icon} {level: <8} | {name}:{function}:{line} - {message}",
-        enqueue=True,     )
+        # idu 只在线程池中并发，loguru 的处理器本身线程安全；
+        # enqueue 会为每条日志做一次序列化和跨线程传递，这里直接同步写入
+        enqueue=False,     )
     
     # 创建配置信息字典
     config_info = {
@@ -143,6 +144,7 @@ class CommandManager:
     def get_target_directory(args):
         if args.clipboard:
             try:
+                import pyperclip  # 仅在读取剪贴板时才需要
                 target_directory = pyperclip.paste().strip().strip('"')
                 if not os.path.exists(target_directory):
                     logger.error(f"[#process]剪贴板中的路径无效: {target_directory}")
@@ -178,12 +180,28 @@ class TaskExecutor:
         print("\n正在扫描画师信息...")
         artists = set()
         
-        # 扫描所有压缩文件以获取画师信息
-        for root, _, files in os.walk(self.target_directory):
-            for file in files:
-                if file.endswith(('.zip', '.rar', '.7z')):
-                    archive_path = os.path.join(root, file)
-                    artist = PathHandler.get_artist_name(self.target_directory, archive_path, self.args.mode)
+        # 画师名只取决于目标目录（单人模式）或第一级路径（多人模式），
+        # 因此每个画师只需找到一个压缩包即可确定，无需遍历全部压缩包
+        if self.args.mode == 'single':
+            if next(ArchiveProcessor.iter_archive_files(self.target_directory), None) is not None:
+                artist = PathHandler.get_artist_name(self.target_directory, self.target_directory, self.args.mode)
+                if artist:
+                    artists.add(artist)
+        else:
+            try:
+                with os.scandir(self.target_directory) as it:
+                    top_entries = list(it)
+            except OSError as e:
+                logger.warning(f"[#process]无法访问目录 {self.target_directory}: {e}")
+                top_entries = []
+
+            for entry in top_entries:
+                if entry.is_dir(follow_symlinks=False):
+                    has_archive = next(ArchiveProcessor.iter_archive_files(entry.path), None) is not None
+                else:
+                    has_archive = entry.name.lower().endswith(ARCHIVE_EXTENSIONS) and entry.is_file()
+                if has_archive:
+                    artist = PathHandler.get_artist_name(self.target_directory, entry.path, self.args.mode)
                     if artist:
                         artists.add(artist)
         
@@ -1,7 +1,9 @@
 import os
 import subprocess
 import shutil
-from typing import Dict, Any, Optional, List
+import tempfile
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
 
 # 导入本地模块
 from .json_handler import JsonHandler
@@ -32,8 +34,8 @@ class ArchiveHandler:
             return True
 
         archive_name = os.path.basename(archive_path)
-        logger.info(f"[#process]开始处理压缩包: {archive_name}")
-        logger.info(f"[#process]需要删除的文件: {files_to_delete}")
+        logger.debug(f"[#process]开始处理压缩包: {archive_name}")
+        logger.debug(f"[#process]需要删除的文件: {files_to_delete}")
 
         # 定义所有可能的临时文件路径
         backup_path = archive_path + ".bak"
@@ -42,46 +44,44 @@ class ArchiveHandler:
 
         try:
             # 备份原文件
-            shutil.copy2(archive_path, backup_path)
-            logger.info(f"[#process][备份] 创建原文件备份: {backup_path}")
-
-            # 使用BandZip删除文件
-            deleted_count = 0
-            for file in files_to_delete:
-                try:
-                    # 使用BandZip的bz命令删除文件
-                    result = subprocess.run(
-                        [
-                            'bz', 'd',          # 删除命令
-                            archive_path,        # 压缩包路径
-                            file,               # 要删除的文件
-                            '/q',               # 安静模式
-                            '/y',               # 自动确认
-                            '/utf8'             # 使用UTF-8编码
-                        ],
-                        capture_output=True,
-                        text=True,
-                        encoding='utf-8',
-                        errors='ignore'
-                    )
+            ArchiveHandler._backup_archive(archive_path, backup_path)
+            logger.debug(f"[#process][备份] 创建原文件备份: {backup_path}")
 
+            # 使用BandZip一次性删除所有文件，失败时再逐个删除以保留部分成功的结果
+            result = ArchiveHandler._run_bandizip_delete(archive_path, files_to_delete)
+            if result is not None and result.returncode == 0:
+                deleted_count = len(files_to_delete)
+                logger.debug(f"[#process][删除成功] {files_to_delete}")
+            elif len(files_to_delete) == 1:
+                deleted_count = 0
+                logger.warning(f"[#process]删除失败: {files_to_delete[0]}")
+                if result is not None:
+                    logger.debug(f"[#process]BandZip输出: {result.stdout}\n{result.stderr}")
+            else:
+                if result is not None:
+                    logger.debug(f"[#process]批量删除失败，改为逐个删除。BandZip输出: {result.stdout}\n{result.stderr}")
+                # 失败的批量删除可能已改动了压缩包，先从备份恢复，逐个删除从原始内容开始；
+                # 否则已被批量删除的条目会计为失败，全部失败时还会用备份撤销这些删除
+                shutil.copy2(backup_path, archive_path)
+                deleted_count = 0
+                for file in files_to_delete:
+                    result = ArchiveHandler._run_bandizip_delete(archive_path, [file])
+                    if result is None:
+                        continue
                     # 检查是否成功
                     if result.returncode == 0:
                         deleted_count += 1
-                        logger.info(f"[#process][删除成功] {file}")
+                        logger.debug(f"[#process][删除成功] {file}")
                     else:
                         logger.warning(f"[#process]删除失败: {file}")
                         logger.debug(f"[#process]BandZip输出: {result.stdout}\n{result.stderr}")
 
-                except Exception as e:
-                    logger.error(f"[#process]删除文件失败 {file}: {e}")
-
             # 检查是否有文件被删除
             if deleted_count == 0:
                 logger.warning("[#process]未成功删除任何文件")
                 # 恢复备份
                 if os.path.exists(backup_path):
-                    shutil.copy2(backup_path, archive_path)
+                    os.replace(backup_path, archive_path)
                     logger.info("[#process][恢复] 从备份恢复原文件")
                 success = False
             else:
@@ -95,7 +95,7 @@ class ArchiveHandler:
             # 恢复备份
             if os.path.exists(backup_path):
                 try:
-                    shutil.copy2(backup_path, archive_path)
+                    os.replace(backup_path, archive_path)
                     logger.info("[#process][恢复] 从备份恢复原文件")
                 except Exception as e:
                     logger.error(f"[#process]恢复备份失败: {e}")
@@ -122,6 +122,107 @@ class ArchiveHandler:
                     except Exception as e:
                         logger.error(f"[#process]删除相关临时文件失败 {file}: {e}")
     
+    @staticmethod
+    def _backup_archive(archive_path: str, backup_path: str) -> None:
+        """创建压缩包备份
+
+        使用完整复制而不是硬链接：无法保证BandZip总是写入新文件再替换，
+        若其原地修改压缩包，硬链接备份会随之被改写。
+        """
+        shutil.copy2(archive_path, backup_path)
+
+    @staticmethod
+    def _run_bandizip_delete(archive_path: str, files: List[str]) -> Optional[subprocess.CompletedProcess]:
+        """调用一次BandZip从压缩包中删除给定的文件
+        
+        Args:
+            archive_path: 压缩包路径
+            files: 要删除的文件列表（支持通配符）
+            
+        Returns:
+            Optional[subprocess.CompletedProcess]: 命令执行结果，启动失败时返回None
+        """
+        try:
+            return subprocess.run(
+                [
+                    _bandizip_executable(), 'd',  # 删除命令
+                    archive_path,        # 压缩包路径
+                    *files,             # 要删除的文件
+                    '/q',               # 安静模式
+                    '/y',               # 自动确认
+                    '/utf8'             # 使用UTF-8编码
+                ],
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                errors='ignore'
+            )
+        except Exception as e:
+            logger.error(f"[#process]删除文件失败 {files}: {e}")
+            return None
+
+    @staticmethod
+    def _list_archive_entries(archive_path: str) -> Tuple[Tuple[str, bool], ...]:
+        """列出压缩包内容，同一压缩包未修改时复用上次的7z结果
+        
+        Args:
+            archive_path: 压缩包路径
+            
+        Returns:
+            Tuple[Tuple[str, bool], ...]: ((压缩包内路径, 是否为文件夹), ...)
+        """
+        try:
+            st = os.stat(archive_path)
+        except OSError:
+            return ArchiveHandler._read_archive_entries(archive_path)
+        return _cached_archive_entries(os.path.abspath(archive_path), st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _read_archive_entries(archive_path: str) -> Tuple[Tuple[str, bool], ...]:
+        """使用7z的技术列表模式(-slt)列出压缩包内容（不经过缓存）
+        
+        Args:
+            archive_path: 压缩包路径
+            
+        Returns:
+            Tuple[Tuple[str, bool], ...]: ((压缩包内路径, 是否为文件夹), ...)
+            
+        Raises:
+            subprocess.CalledProcessError: 7z执行失败
+        """
+        startupinfo = None
+        if os.name == 'nt':
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+        result = subprocess.run(
+            ['7z', 'l', '-slt', '-sccUTF-8', archive_path],
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='ignore',
+            startupinfo=startupinfo,
+            check=True
+        )
+
+        entries = []
+        in_entries = False  # "----------" 之前是压缩包自身的信息
+        path = None
+        for line in result.stdout.splitlines():
+            if not in_entries:
+                in_entries = line == '----------'
+            elif line.startswith('Path = '):
+                if path is not None:
+                    entries.append((path, False))
+                path = line[7:]
+            elif path is not None and (line == 'Folder = +' or
+                                       (line.startswith('Attributes = ') and line[13:14] == 'D')):
+                entries.append((path, True))
+                path = None
+        if path is not None:
+            entries.append((path, False))
+        return tuple(entries)
+
     @staticmethod
     def load_yaml_uuid_from_archive(archive_path: str) -> Optional[str]:
         """从压缩包中加载YAML文件的UUID"""
@@ -142,32 +243,13 @@ class ArchiveHandler:
     def _load_uuid_from_7z(archive_path: str, ext: str) -> Optional[str]:
         """使用7z命令行工具加载UUID"""
         try:
-            startupinfo = None
-            if os.name == 'nt':
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            
-            result = subprocess.run(
-                ['7z', 'l', archive_path],
-                capture_output=True,
-                text=True,
-                encoding='gbk',
-                errors='ignore',
-                startupinfo=startupinfo,
-                check=False
-            )
-            
-            if result.returncode != 0:
-                return None
-            
-            for line in result.stdout.splitlines():
-                if not line.strip():
-                    continue
-                if line.endswith(ext):
+            for name, is_dir in ArchiveHandler._list_archive_entries(archive_path):
+                if not is_dir and name.endswith(ext):
                     # 只提取文件名部分，忽略路径
-                    filename = os.path.basename(line.split()[-1])
+                    filename = os.path.basename(name.replace('\\', '/'))
                     return os.path.splitext(filename)[0]
-                    
+        except subprocess.CalledProcessError:
+            return None
         except Exception as e:
             logger.error(f"使用7z读取压缩包失败 {archive_path}: {e}")
         return None
@@ -217,38 +299,40 @@ class ArchiveHandler:
             # 检查压缩包结构
             target_path = json_name
             folder_structure = ArchiveHandler._analyze_folder_structure(archive_path)
-            logger.info(f"[#process]压缩包结构分析: {folder_structure} - {os.path.basename(archive_path)}")
+            logger.debug(f"[#process]压缩包结构分析: {folder_structure} - {os.path.basename(archive_path)}")
 
             # 只对单文件夹结构进行特殊处理
             if folder_structure == "single_folder":
                 single_folder = ArchiveHandler._get_single_folder_name(archive_path)
-                logger.info(f"[#process]检测到单文件夹: {single_folder} - {os.path.basename(archive_path)}")
+                logger.debug(f"[#process]检测到单文件夹: {single_folder} - {os.path.basename(archive_path)}")
                 if single_folder:
                     target_path = f"{single_folder}/{json_name}"
-                    logger.info(f"[#process]目标路径设置为: {target_path} - {os.path.basename(archive_path)}")
+                    logger.debug(f"[#process]目标路径设置为: {target_path} - {os.path.basename(archive_path)}")
             
             # 使用7z方式添加JSON文件
-            logger.info(f"[#process]使用7z方式添加JSON文件 - {os.path.basename(archive_path)}")
+            logger.debug(f"[#process]使用7z方式添加JSON文件 - {os.path.basename(archive_path)}")
 
             try:
                 if folder_structure == "single_folder":
-                    single_folder = ArchiveHandler._get_single_folder_name(archive_path)
                     if single_folder:
-                        # 创建临时目录结构
-                        temp_dir = os.path.join(os.path.dirname(json_path), 'temp_7z')
-                        os.makedirs(os.path.join(temp_dir, single_folder), exist_ok=True)
-                        temp_json_path = os.path.join(temp_dir, single_folder, json_name)
-                        shutil.copy2(json_path, temp_json_path)
-
-                        # 使用7z添加整个目录结构
-                        subprocess.run(
-                            ['7z', 'a', archive_path, os.path.join(temp_dir, single_folder)],
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.DEVNULL,
-                            check=True
-                        )
-                        shutil.rmtree(temp_dir, ignore_errors=True)
-                        logger.info(f"[#process]7z方式添加JSON文件: {single_folder}/{json_name}")
+                        # 在独立的临时目录中构建目录结构，避免并发处理时互相覆盖
+                        with tempfile.TemporaryDirectory(prefix='idu_7z_') as temp_dir:
+                            folder_temp_dir = os.path.join(temp_dir, single_folder)
+                            os.makedirs(folder_temp_dir)
+                            temp_json_path = os.path.join(folder_temp_dir, json_name)
+                            try:
+                                os.link(json_path, temp_json_path)
+                            except OSError:
+                                shutil.copy2(json_path, temp_json_path)
+
+                            # 使用7z添加整个目录结构
+                            subprocess.run(
+                                ['7z', 'a', archive_path, folder_temp_dir],
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL,
+                                check=True
+                            )
+                        logger.debug(f"[#process]7z方式添加JSON文件: {single_folder}/{json_name}")
                         return True
 
                 # 普通结构或无文件夹结构直接添加
@@ -258,7 +342,7 @@ class ArchiveHandler:
                     stderr=subprocess.DEVNULL,
                     check=True
                 )
-                logger.info(f"[#process]7z方式添加JSON文件: {json_name}")
+                logger.debug(f"[#process]7z方式添加JSON文件: {json_name}")
                 return True
             except subprocess.CalledProcessError as e:
                 logger.error(f"[#process]7z方式失败: {e}")
@@ -279,8 +363,7 @@ class ArchiveHandler:
                 return None
             
             # 创建临时目录
-            temp_dir = os.path.join(os.path.dirname(archive_path), '.temp_extract')
-            os.makedirs(temp_dir, exist_ok=True)
+            temp_dir = tempfile.mkdtemp(prefix='idu_extract_')
             
             try:
                 # 1. 提取YAML文件
@@ -297,17 +380,8 @@ class ArchiveHandler:
                 # 3. 检查是否存在同名JSON文件
                 json_files = []
                 try:
-                    result = subprocess.run(
-                        ['7z', 'l', archive_path],
-                        capture_output=True,
-                        text=True,
-                        encoding='gbk',
-                        errors='ignore',
-                        check=True
-                    )
-                    if result.returncode == 0:
-                        json_files = [line.split()[-1] for line in result.stdout.splitlines()
-                                    if line.strip() and line.endswith('.json')]
+                    json_files = [name for name, is_dir in ArchiveHandler._list_archive_entries(archive_path)
+                                  if not is_dir and name.endswith('.json')]
                 except subprocess.CalledProcessError:
                     pass
                 
@@ -352,31 +426,25 @@ class ArchiveHandler:
             str: "no_folder" | "single_folder" | "multiple_folders"
         """
         try:
-            result = subprocess.run(
-                ['7z', 'l', archive_path],
-                capture_output=True,
-                text=True,
-                encoding='gbk',
-                errors='ignore',
-                check=True
-            )
             root_items = set()
-            for line in result.stdout.splitlines():
-                if line.strip() and not line.startswith('-') and not line.startswith('Date'):
-                    parts = line.split()
-                    if len(parts) >= 6:
-                        name = parts[-1]
-                        if '/' in name or '\\' in name:
-                            root_items.add(name.split('/')[0].split('\\')[0])
-                        else:
-                            root_items.add('')
-
-            if '' in root_items:
-                return "no_folder" if len(root_items) == 1 else "multiple_folders"
-            elif len(root_items) == 1:
-                return "single_folder"
-            else:
-                return "multiple_folders"
+            for name, is_dir in ArchiveHandler._list_archive_entries(archive_path):
+                # 第一个路径分隔符（/ 或 \\）之前的部分即根目录项，根目录下的文件记为''
+                i = name.find('/')
+                j = name.find('\\')
+                k = i if j < 0 else (j if i < 0 else min(i, j))
+                if k >= 0:
+                    root_items.add(name[:k])
+                elif is_dir:
+                    root_items.add(name)
+                else:
+                    root_items.add('')
+                # 根目录已出现两项，无论后续内容如何都是多文件夹结构
+                if len(root_items) > 1:
+                    return "multiple_folders"
+
+            if not root_items or '' in root_items:
+                return "no_folder"
+            return "single_folder"
         except Exception:
             return "no_folder"
 
@@ -384,21 +452,24 @@ class ArchiveHandler:
     def _get_single_folder_name(archive_path: str) -> Optional[str]:
         """获取单文件夹结构中的文件夹名称"""
         try:
-            result = subprocess.run(
-                ['7z', 'l', archive_path],
-                capture_output=True,
-                text=True,
-                encoding='gbk',
-                errors='ignore',
-                check=True
-            )
-            for line in result.stdout.splitlines():
-                if line.strip() and not line.startswith('-') and not line.startswith('Date'):
-                    parts = line.split()
-                    if len(parts) >= 6:
-                        name = parts[-1]
-                        if '/' in name or '\\' in name:
-                            return name.split('/')[0].split('\\')[0]
+            for name, is_dir in ArchiveHandler._list_archive_entries(archive_path):
+                name = name.replace('\\', '/')
+                if '/' in name:
+                    return name.split('/')[0]
+                if is_dir:
+                    return name
         except Exception:
             pass
         return None
+
+
+@lru_cache(maxsize=256)
+def _cached_archive_entries(archive_path: str, mtime_ns: int, size: int) -> Tuple[Tuple[str, bool], ...]:
+    """按(路径, 修改时间, 大小)缓存压缩包列表，压缩包被修改后自动失效"""
+    return ArchiveHandler._read_archive_entries(archive_path)
+
+
+@lru_cache(maxsize=1)
+def _bandizip_executable() -> str:
+    """解析一次BandZip命令行程序路径，找不到时交给系统按名称查找"""
+    return shutil.which('bz') or 'bz'
@@ -1,6 +1,7 @@
 import os
 import time
 import shutil
+import tempfile
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List
 
@@ -12,6 +13,9 @@ from idu.sql.db_manager import DBManager
 
 from loguru import logger
 
+# 支持的压缩文件后缀（小写），用于 str.endswith 的元组匹配
+ARCHIVE_EXTENSIONS = ('.zip', '.rar', '.7z')
+
 
 class ArchiveProcessor:
     """压缩文件处理类"""
@@ -47,32 +51,49 @@ class ArchiveProcessor:
             timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
             logger.info("[#current_stats]🔍 开始扫描压缩文件")
             
-            # 直接快速扫描SSD
-            archive_files = []
-            for root, _, files in os.walk(self.target_directory):
-                for file in files:
-                    if file.endswith(('.zip', '.rar', '.7z')):
-                        archive_files.append(os.path.join(root, file))
-            
-            self.total_archives = len(archive_files)
             self.processed_archives = 0
-            logger.info(f"[#current_stats]共发现 {self.total_archives} 个压缩文件")
             
-            # 使用内存缓存处理
+            # 边扫描边提交，目录遍历与压缩包处理重叠进行
             with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = [executor.submit(self.process_single_archive, path, timestamp) 
-                         for path in archive_files]
+                futures = [executor.submit(self.process_single_archive, path, timestamp)
+                           for path in self.iter_archive_files(self.target_directory)]
                 
+                self.total_archives = len(futures)
+                logger.info(f"[#current_stats]共发现 {self.total_archives} 个压缩文件")
+                
+                # 进度每变化1%（或处理完成时）才输出一次，避免逐个压缩包刷日志
+                last_percent = -1
                 for future in as_completed(futures):
                     future.result()
                     self.processed_archives += 1
                     progress = (self.processed_archives / self.total_archives) * 100
-                    logger.info(f"[@current_progress]处理进度: ({self.processed_archives}/{self.total_archives}) {progress:.1f}%")
+                    if int(progress) != last_percent or self.processed_archives == self.total_archives:
+                        last_percent = int(progress)
+                        logger.info(f"[@current_progress]处理进度: ({self.processed_archives}/{self.total_archives}) {progress:.1f}%")
             
             return True
         finally:
             logger.info("[#current_stats]✨ 所有文件处理完成！")
     
+    @staticmethod
+    def iter_archive_files(directory: str):
+        """用os.scandir递归遍历目录，逐个产出压缩文件路径
+        
+        DirEntry自带文件类型信息，无需对每个条目再调用stat
+        """
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.lower().endswith(ARCHIVE_EXTENSIONS) and entry.is_file():
+                            yield entry.path
+            except OSError as e:
+                logger.warning(f"[#process]无法访问目录 {current}: {e}")
+    
     def process_single_archive(self, archive_path: str, timestamp: str) -> bool:
         """处理单个压缩文件
         
@@ -144,8 +165,7 @@ class ArchiveProcessor:
             )
 
             # 提取临时目录
-            temp_dir = os.path.join(os.path.dirname(archive_path), '.temp_extract')
-            os.makedirs(temp_dir, exist_ok=True)
+            temp_dir = tempfile.mkdtemp(prefix='idu_extract_')
 
             try:
                 # 提取所有JSON和YAML文件
@@ -244,11 +264,12 @@ class ArchiveProcessor:
         files_to_delete.extend(yaml_files)
         if files_to_delete:
             logger.info(f"[#process]删除现有文件: {os.path.basename(archive_path)}")
+            # 通配符和具体文件名合并为一次删除调用
+            patterns = list(dict.fromkeys(['*.json', '*.yaml', *files_to_delete]))
             try:
-                ArchiveHandler.delete_files_from_archive(archive_path, ['*.json', '*.yaml'])
-            except Exception:
-                pass
-            ArchiveHandler.delete_files_from_archive(archive_path, files_to_delete)
+                ArchiveHandler.delete_files_from_archive(archive_path, patterns)
+            except Exception as e:
+                logger.error(f"[#process]删除现有文件失败 {archive_name}: {e}")
         uuid_value = UuidHandler.generate_uuid(UuidHandler.load_existing_uuids(self.db_path))
         json_filename = f"{uuid_value}.json"
         day_dir = PathHandler.get_uuid_path(self.uuid_directory, timestamp)
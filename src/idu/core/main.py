@@ -1,10 +1,9 @@
 import os
 import sys
 import argparse
-import pyperclip
 import subprocess
 
-from idu.core.archive_processor import ArchiveProcessor
+from idu.core.archive_processor import ArchiveProcessor, ARCHIVE_EXTENSIONS
 from idu.core.uuid_record_manager import UuidRecordManager
 from idu.core.path_handler import PathHandler
 from loguru import logger
@@ -33,6 +32,7 @@ class CommandManager:
     def get_target_directory(args):
         if args.clipboard:
             try:
+                import pyperclip  # 仅在读取剪贴板时才需要
                 target_directory = pyperclip.paste().strip().strip('"')
                 if not os.path.exists(target_directory):
                     logger.error(f"[#process]剪贴板中的路径无效: {target_directory}")
@@ -68,12 +68,28 @@ class TaskExecutor:
         print("\n正在扫描画师信息...")
         artists = set()
         
-        # 扫描所有压缩文件以获取画师信息
-        for root, _, files in os.walk(self.target_directory):
-            for file in files:
-                if file.endswith(('.zip', '.rar', '.7z')):
-                    archive_path = os.path.join(root, file)
-                    artist = PathHandler.get_artist_name(self.target_directory, archive_path, self.args.mode)
+        # 画师名只取决于目标目录（单人模式）或第一级路径（多人模式），
+        # 因此每个画师只需找到一个压缩包即可确定，无需遍历全部压缩包
+        if self.args.mode == 'single':
+            if next(ArchiveProcessor.iter_archive_files(self.target_directory), None) is not None:
+                artist = PathHandler.get_artist_name(self.target_directory, self.target_directory, self.args.mode)
+                if artist:
+                    artists.add(artist)
+        else:
+            try:
+                with os.scandir(self.target_directory) as it:
+                    top_entries = list(it)
+            except OSError as e:
+                logger.warning(f"[#process]无法访问目录 {self.target_directory}: {e}")
+                top_entries = []
+
+            for entry in top_entries:
+                if entry.is_dir(follow_symlinks=False):
+                    has_archive = next(ArchiveProcessor.iter_archive_files(entry.path), None) is not None
+                else:
+                    has_archive = entry.name.lower().endswith(ARCHIVE_EXTENSIONS) and entry.is_file()
+                if has_archive:
+                    artist = PathHandler.get_artist_name(self.target_directory, entry.path, self.args.mode)
                     if artist:
                         artists.add(artist)
         
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
@@ -7,6 +8,31 @@ from loguru import logger
 class PathHandler:
     """路径处理类"""
     
+    @staticmethod
+    def _relative_to(target_directory: str, archive_path: str, resolve: bool = False) -> str:
+        """用字符串前缀计算相对路径，避免为每个压缩包构造Path对象
+        
+        默认只做 abspath + normcase 的字面比较，不访问文件系统；resolve=True 时先解析符号链接，
+        目标目录的解析结果会被缓存，每个压缩包只解析自身路径。
+        archive_path 与 target_directory 相同时返回空字符串。
+        
+        Raises:
+            ValueError: archive_path 不在 target_directory 下
+        """
+        if resolve:
+            root = _resolved_directory(target_directory)
+            archive_path = os.path.realpath(archive_path)
+        else:
+            root = os.path.abspath(target_directory)
+            archive_path = os.path.abspath(archive_path)
+        normalized_path = os.path.normcase(archive_path)
+        if normalized_path == os.path.normcase(root):
+            return ""
+        root_prefix = os.path.join(root, '')
+        if not normalized_path.startswith(os.path.normcase(root_prefix)):
+            raise ValueError(f"{archive_path} 不在 {root_prefix} 下")
+        return archive_path[len(root_prefix):]
+
     @staticmethod
     def get_artist_name(target_directory: str, archive_path: str, mode: str = 'multi') -> str:
         """从压缩文件路径中提取艺术家名称
@@ -25,16 +51,12 @@ class PathHandler:
         else:
             # 多人模式：使用相对路径的第一级子文件夹名作为画师名
             try:
-                # 将路径转换为相对路径
-                archive_path = Path(archive_path)
-                target_path = Path(target_directory)
-                
                 # 获取相对于目标目录的路径
-                relative_path = archive_path.relative_to(target_path)
+                relative_path = PathHandler._relative_to(target_directory, archive_path)
                 
                 # 获取第一级子文件夹名
-                if len(relative_path.parts) > 0:
-                    return relative_path.parts[0]
+                if relative_path:
+                    return relative_path.split(os.sep, 1)[0]
                 
                 logger.warning(f"[#process]无法从路径提取画师名: {archive_path}")
                 return ""
@@ -55,23 +77,11 @@ class PathHandler:
             str: 相对路径，不包含文件名
         """
         try:
-            # 将路径转换为Path对象并规范化
-            archive_path = Path(archive_path).resolve()
-            target_path = Path(target_directory).resolve()
-            
-            # 获取相对路径
-            relative_path = archive_path.relative_to(target_path)
+            # 获取相对路径，返回父目录部分（不包含文件名）
+            relative_parent = os.path.dirname(PathHandler._relative_to(target_directory, archive_path, resolve=True))
             
             # 如果是直接在目标目录下的文件，返回"."
-            if not relative_path.parent.parts:
-                return "."
-                
-            # 返回父目录的相对路径（不包含文件名），保持原始路径分隔符
-            relative_str = str(relative_path.parent)
-            # 如果路径中包含反斜杠，保持原样
-            if '\\' in archive_path.as_posix():
-                relative_str = relative_str.replace('/', '\\')
-            return relative_str
+            return relative_parent or "."
             
         except Exception as e:
             # 如果出错，记录错误但返回一个安全的默认值
@@ -104,3 +114,9 @@ class PathHandler:
             return win32api.GetShortPathName(long_path)
         except ImportError:
             return long_path
+
+
+@lru_cache(maxsize=64)
+def _resolved_directory(target_directory: str) -> str:
+    """解析目标目录的真实路径；处理过程中目标目录不变，只解析一次"""
+    return os.path.realpath(target_directory)
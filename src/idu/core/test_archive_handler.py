@@ -250,7 +250,69 @@ class TestArchiveHandler:
         
         result = ArchiveHandler.delete_files_from_archive(zip_path, ["file1.txt"])
         assert result == False
-    
+
+    @patch('subprocess.run')
+    def test_delete_files_from_archive_single_call(self, mock_run):
+        """测试多个文件只调用一次BandZip"""
+        zip_path = os.path.join(self.temp_dir, "test.zip")
+        with open(zip_path, 'wb') as f:
+            f.write(b'PK')
+        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+
+        result = ArchiveHandler.delete_files_from_archive(zip_path, ["file1.txt", "file2.txt"])
+        assert result == True
+        assert mock_run.call_count == 1
+        cmd = mock_run.call_args[0][0]
+        assert cmd[1:3] == ['d', zip_path]
+        assert "file1.txt" in cmd and "file2.txt" in cmd
+
+    @patch('subprocess.run')
+    def test_delete_files_from_archive_batch_fallback(self, mock_run):
+        """测试批量删除失败时逐个删除"""
+        zip_path = os.path.join(self.temp_dir, "test.zip")
+        with open(zip_path, 'wb') as f:
+            f.write(b'PK')
+        mock_run.side_effect = [
+            MagicMock(returncode=1, stdout="", stderr="error"),
+            MagicMock(returncode=0, stdout="", stderr=""),
+            MagicMock(returncode=1, stdout="", stderr="error"),
+        ]
+
+        result = ArchiveHandler.delete_files_from_archive(zip_path, ["file1.txt", "missing.txt"])
+        assert result == True
+        assert mock_run.call_count == 3
+
+    @patch('subprocess.run')
+    def test_delete_files_from_archive_fallback_starts_from_backup(self, mock_run):
+        """测试批量删除失败但已改动压缩包时，逐个删除前先从备份恢复"""
+        zip_path = os.path.join(self.temp_dir, "test.zip")
+        with open(zip_path, 'wb') as f:
+            f.write(b'original')
+        seen = []
+
+        def fake_run(cmd, **kwargs):
+            with open(zip_path, 'rb') as f:
+                seen.append(f.read())
+            if len(seen) == 1:
+                # 批量删除中途失败，压缩包已被部分改写
+                with open(zip_path, 'wb') as f:
+                    f.write(b'partial')
+                return MagicMock(returncode=1, stdout="", stderr="error")
+            with open(zip_path, 'wb') as f:
+                f.write(b'deleted')
+            return MagicMock(returncode=0, stdout="", stderr="")
+
+        mock_run.side_effect = fake_run
+
+        result = ArchiveHandler.delete_files_from_archive(zip_path, ["file1.txt", "file2.txt"])
+        assert result == True
+        assert mock_run.call_count == 3
+        # 第一次逐个删除看到的是原始内容而不是批量删除留下的部分结果
+        assert seen[1] == b'original'
+        with open(zip_path, 'rb') as f:
+            assert f.read() == b'deleted'
+        assert not os.path.exists(zip_path + ".bak")
+
     def test_delete_files_from_archive_empty_list(self):
         """测试删除空文件列表"""
         zip_path = self.create_test_zip("no_folder")
@@ -274,5 +336,93 @@ class TestArchiveHandler:
         # 由于mock的输出格式，这个测试主要验证不会崩溃
         mock_run.assert_called()
 
+    SLT_OUTPUT = (
+        "7-Zip [64] 16.02 : Copyright (c) 1999-2016 Igor Pavlov : 2016-05-21\n"
+        "\n"
+        "Listing archive: test.zip\n"
+        "\n"
+        "--\n"
+        "Path = test.zip\n"
+        "Type = zip\n"
+        "\n"
+        "----------\n"
+        "Path = folder1\n"
+        "Folder = +\n"
+        "Attributes = D\n"
+        "\n"
+        "Path = folder1/my file.json\n"
+        "Folder = -\n"
+        "Attributes = A\n"
+        "\n"
+        "Path = folder1/file2.txt\n"
+        "Folder = -\n"
+        "Attributes = A\n"
+    )
+
+    @patch('subprocess.run')
+    def test_list_archive_entries_slt(self, mock_run):
+        """测试解析7z -slt输出（含空格文件名）"""
+        mock_run.return_value = MagicMock(returncode=0, stdout=self.SLT_OUTPUT)
+
+        entries = ArchiveHandler._list_archive_entries("test.zip")
+        assert entries == (
+            ("folder1", True),
+            ("folder1/my file.json", False),
+            ("folder1/file2.txt", False),
+        )
+        assert ArchiveHandler._analyze_folder_structure("test.zip") == "single_folder"
+        assert ArchiveHandler._get_single_folder_name("test.zip") == "folder1"
+        assert ArchiveHandler.load_json_uuid_from_archive("test.zip") == "my file"
+
+    @patch('subprocess.run')
+    def test_list_archive_entries_cached_until_modified(self, mock_run):
+        """测试同一压缩包未修改时只调用一次7z"""
+        zip_path = os.path.join(self.temp_dir, "cached.zip")
+        with open(zip_path, 'wb') as f:
+            f.write(b'PK')
+        mock_run.return_value = MagicMock(returncode=0, stdout=self.SLT_OUTPUT)
+
+        assert ArchiveHandler._analyze_folder_structure(zip_path) == "single_folder"
+        assert ArchiveHandler._get_single_folder_name(zip_path) == "folder1"
+        assert mock_run.call_count == 1
+
+        with open(zip_path, 'ab') as f:
+            f.write(b'changed')
+        ArchiveHandler._list_archive_entries(zip_path)
+        assert mock_run.call_count == 2
+
+    @patch.object(ArchiveHandler, '_list_archive_entries')
+    def test_analyze_folder_structure_separators(self, mock_entries):
+        """测试根目录项识别（混合分隔符）"""
+        mock_entries.return_value = (("folder1\\a.jpg", False), ("folder1/sub/b.jpg", False))
+        assert ArchiveHandler._analyze_folder_structure("test.zip") == "single_folder"
+
+        mock_entries.return_value = (("folder1/a.jpg", False), ("folder2\\b.jpg", False), ("c.json", False))
+        assert ArchiveHandler._analyze_folder_structure("test.zip") == "multiple_folders"
+
+        mock_entries.return_value = (("folder1/a.jpg", False), ("c.json", False))
+        assert ArchiveHandler._analyze_folder_structure("test.zip") == "multiple_folders"
+
+        mock_entries.return_value = (("a.jpg", False), ("b.json", False))
+        assert ArchiveHandler._analyze_folder_structure("test.zip") == "no_folder"
+
+        mock_entries.return_value = ()
+        assert ArchiveHandler._analyze_folder_structure("test.zip") == "no_folder"
+
+    def test_backup_archive_independent_copy(self):
+        """测试备份是独立副本，原地修改压缩包不影响备份"""
+        zip_path = os.path.join(self.temp_dir, "test.zip")
+        with open(zip_path, 'wb') as f:
+            f.write(b'PK')
+        backup_path = zip_path + ".bak"
+
+        ArchiveHandler._backup_archive(zip_path, backup_path)
+        assert not os.path.samefile(zip_path, backup_path)
+
+        with open(zip_path, 'r+b') as f:
+            f.write(b'XX')
+        with open(backup_path, 'rb') as f:
+            assert f.read() == b'PK'
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file
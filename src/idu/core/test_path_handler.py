@@ -0,0 +1,82 @@
+import os
+import tempfile
+import shutil
+import pytest
+from unittest.mock import patch
+
+from idu.core.path_handler import PathHandler
+
+class TestPathHandler:
+    
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = os.path.realpath(tempfile.mkdtemp())
+        self.target_dir = os.path.join(self.temp_dir, "target")
+        os.makedirs(os.path.join(self.target_dir, "artist", "sub"))
+        
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_get_artist_name_multi(self):
+        """测试多人模式取第一级文件夹名"""
+        archive_path = os.path.join(self.target_dir, "artist", "sub", "a.zip")
+        assert PathHandler.get_artist_name(self.target_dir, archive_path, 'multi') == "artist"
+
+    def test_get_relative_path(self):
+        """测试相对路径只包含父目录，顶层文件返回'.'"""
+        nested = os.path.join(self.target_dir, "artist", "sub", "a.zip")
+        top = os.path.join(self.target_dir, "a.zip")
+        assert PathHandler.get_relative_path(self.target_dir, nested) == os.path.join("artist", "sub")
+        assert PathHandler.get_relative_path(self.target_dir, top) == "."
+
+    def test_relative_to_same_path(self):
+        """测试路径与目标目录相同时返回空字符串，提取画师名时记录警告而不是错误"""
+        assert PathHandler._relative_to(self.target_dir, self.target_dir) == ""
+        with patch('idu.core.path_handler.logger') as mock_logger:
+            assert PathHandler.get_artist_name(self.target_dir, self.target_dir + os.sep, 'multi') == ""
+            mock_logger.warning.assert_called_once()
+            mock_logger.error.assert_not_called()
+
+    def test_relative_to_outside_target(self):
+        """测试目标目录之外的路径（包括同名前缀的兄弟目录）会抛出ValueError"""
+        with pytest.raises(ValueError):
+            PathHandler._relative_to(self.target_dir, os.path.join(self.temp_dir, "target2", "a.zip"))
+
+    def _symlink_dir(self, target, link):
+        try:
+            os.symlink(target, link, target_is_directory=True)
+        except (OSError, NotImplementedError):
+            pytest.skip("无法创建符号链接")
+
+    def test_artist_name_does_not_resolve_symlinks(self):
+        """测试画师名按字面路径计算，指向目标目录之外的画师文件夹链接仍取链接名"""
+        outside = os.path.join(self.temp_dir, "outside")
+        os.makedirs(outside)
+        link_dir = os.path.join(self.target_dir, "linked_artist")
+        self._symlink_dir(outside, link_dir)
+        archive_path = os.path.join(link_dir, "a.zip")
+
+        assert PathHandler._relative_to(self.target_dir, archive_path) == os.path.join("linked_artist", "a.zip")
+        assert PathHandler.get_artist_name(self.target_dir, archive_path, 'multi') == "linked_artist"
+
+    def test_relative_path_resolves_symlinks(self):
+        """测试相对路径与原先的 Path.resolve() 一致，目标目录经由符号链接访问时仍能得到正确结果"""
+        link_dir = os.path.join(self.temp_dir, "link")
+        self._symlink_dir(self.target_dir, link_dir)
+        archive_path = os.path.join(self.target_dir, "artist", "sub", "a.zip")
+
+        assert PathHandler.get_relative_path(link_dir, archive_path) == os.path.join("artist", "sub")
+        assert PathHandler.get_relative_path(self.target_dir, os.path.join(link_dir, "artist", "a.zip")) == "artist"
+
+    def test_relative_to_is_lexical(self):
+        """测试默认比较不访问文件系统"""
+        archive_path = os.path.join(self.target_dir, "artist", "a.zip")
+        with patch('os.path.realpath') as mock_realpath, patch('os.lstat') as mock_lstat:
+            assert PathHandler._relative_to(self.target_dir, archive_path) == os.path.join("artist", "a.zip")
+            mock_realpath.assert_not_called()
+            mock_lstat.assert_not_called()
+
+if __name__ == '__main__':
+    pytest.main([__file__])
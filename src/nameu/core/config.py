@@ -3,6 +3,7 @@
 # 纯 Python 结构的正则分组和类型映射
 
 import os
+import re
 import toml
 from loguru import logger
 
@@ -47,6 +48,33 @@ def load_config():
 # 执行初始化加载
 load_config()
 
+# 路径关键词黑名单的预编译正则，按关键词列表签名缓存，列表变化时自动重建
+_keyword_pattern = None
+_keyword_signature = None
+
+def _get_keyword_pattern():
+    """获取路径关键词黑名单对应的正则（忽略大小写），无关键词时返回 None"""
+    global _keyword_pattern, _keyword_signature
+    signature = tuple(path_blacklist_keywords or ())
+    if signature != _keyword_signature:
+        _keyword_pattern = re.compile('|'.join(map(re.escape, signature)), re.IGNORECASE) if signature else None
+        _keyword_signature = signature
+    return _keyword_pattern
+
+# 路径黑名单的目录前缀元组（绝对路径 + 分隔符），同样按签名缓存
+_prefix_tuple = ()
+_prefix_signature = None
+
+def _get_blacklist_prefixes():
+    """获取路径黑名单对应的前缀元组，供 str.startswith 一次性匹配"""
+    global _prefix_tuple, _prefix_signature
+    # 相对路径按当前工作目录解析，因此工作目录也纳入签名
+    signature = (tuple(path_blacklist or ()), os.getcwd())
+    if signature != _prefix_signature:
+        _prefix_tuple = tuple(os.path.join(os.path.abspath(p), '') for p in signature[0])
+        _prefix_signature = signature
+    return _prefix_tuple
+
 def is_path_blacklisted(path: str) -> bool:
     """检查路径是否在黑名单中"""
     # 转换为绝对路径进行比较
@@ -54,17 +82,14 @@ def is_path_blacklisted(path: str) -> bool:
     
     # 1. 检查精确路径/父目录匹配
     if path_blacklist:
-        for blacklisted_path in path_blacklist:
-            abs_blacklisted = os.path.abspath(blacklisted_path)
-            if abs_path == abs_blacklisted or abs_path.startswith(os.path.join(abs_blacklisted, '')):
-                return True
+        # 末尾补分隔符后，"等于黑名单目录"与"位于其下"统一为一次前缀匹配
+        if os.path.join(abs_path, '').startswith(_get_blacklist_prefixes()):
+            return True
             
     # 2. 检查路径关键词匹配
-    if path_blacklist_keywords:
-        path_lower = abs_path.lower()
-        for keyword in path_blacklist_keywords:
-            if keyword.lower() in path_lower:
-                return True
+    keyword_pattern = _get_keyword_pattern()
+    if keyword_pattern is not None and keyword_pattern.search(abs_path):
+        return True
                 
     return False
 
@@ -15,6 +15,12 @@ _SAMENAME_PATTERN = re.compile(r'\[samename_\d+\]')
 _TRAILING_COUNTER_PATTERN = re.compile(r'\s\(\d+\)$')
 _BRACKET_CONTENT_PATTERN = re.compile(r'\[([^\[\]]+)\]')
 _PAREN_CONTENT_PATTERN = re.compile(r'\(([^\(\)]+)\)')
+_CURLY_CONTENT_PATTERN = re.compile(r'\{[^}]*\}')
+_C_NUMBER_PATTERN = re.compile(r'C(\d+)')
+_DATE_PATTERN = re.compile(r'(\d{4})\.(\d{2})')
+_EMPTY_PAREN_PATTERN = re.compile(r'\(\s*\)\s*')
+_EMPTY_BRACKET_PATTERN = re.compile(r'\[\s*\]\s*')
+_MULTI_SPACE_PATTERN = re.compile(r'\s{2,}')
 _BASIC_REPLACEMENTS = [
     (re.compile(r'（'), '('),
     (re.compile(r'）'), ')'),
@@ -450,7 +456,7 @@ def get_unique_filename(directory, filename, artist_name, is_excluded=False, exi
     base, ext = os.path.splitext(filename)
     
     # 预处理：清理所有花括号内容
-    base = re.sub(r'\{[^}]*\}', '', base)
+    base = _CURLY_CONTENT_PATTERN.sub('', base)
     
     # 删除重复的方括号内容
     base = remove_duplicate_brackets(base)
@@ -521,8 +527,8 @@ def get_unique_filename(directory, filename, artist_name, is_excluded=False, exi
     for element in remaining_elements[:]:
         matched = False
         # 检查是否同时包含日期和C编号
-        c_match = re.search(r'C(\d+)', element)
-        date_match = re.search(r'(\d{4})\.(\d{2})', element)
+        c_match = _C_NUMBER_PATTERN.search(element)
+        date_match = _DATE_PATTERN.search(element)
         
         if c_match and date_match:
             # 如果同时包含，分别处理
@@ -570,9 +576,9 @@ def get_unique_filename(directory, filename, artist_name, is_excluded=False, exi
     new_base = f"{prefix_part}{middle_part}{suffix_part}".strip()
     
     # 最后再次清理可能残留的空括号和空方框
-    new_base = re.sub(r'\(\s*\)\s*', ' ', new_base)  # 清理空括号
-    new_base = re.sub(r'\[\s*\]\s*', ' ', new_base)  # 清理空方框
-    new_base = re.sub(r'\s{2,}', ' ', new_base)  # 清理多余空格
+    new_base = _EMPTY_PAREN_PATTERN.sub(' ', new_base)  # 清理空括号
+    new_base = _EMPTY_BRACKET_PATTERN.sub(' ', new_base)  # 清理空方框
+    new_base = _MULTI_SPACE_PATTERN.sub(' ', new_base)  # 清理多余空格
     new_base = new_base.strip()
     
     # 限制文件名长度为NAME_LEN个字符（不包括扩展名）
@@ -586,6 +592,43 @@ def get_unique_filename(directory, filename, artist_name, is_excluded=False, exi
     filename = f"{new_base}{ext}"
     return get_unique_filename_with_samename(directory, filename, existing_names=existing_names, normalized_cache=normalized_cache)
 
+def get_unique_filenames(directory, filenames, artist_name, is_excluded=False):
+    """
+    批量生成唯一文件名
+
+    目录只扫描一次并构建文件名缓存，之后每个文件名都在内存中检查冲突；
+    已生成的文件名会加入缓存，保证同一批次内的结果互不冲突。
+
+    Args:
+        directory: 文件所在目录
+        filenames: 待处理的文件名列表
+        artist_name: 画师名称
+        is_excluded: 是否为排除的文件夹
+
+    Returns:
+        List[str]: 与输入顺序一致的唯一文件名列表
+    """
+    existing_names = set(os.listdir(directory))
+    normalized_cache = {}
+    for name in existing_names:
+        normalized_cache.setdefault(normalize_filename(name), []).append(name)
+
+    results = []
+    for filename in filenames:
+        new_filename = get_unique_filename(
+            directory,
+            filename,
+            artist_name,
+            is_excluded,
+            existing_names=existing_names,
+            normalized_cache=normalized_cache,
+        )
+        # 预定该文件名，避免批次内后续文件抢占
+        existing_names.add(new_filename)
+        normalized_cache.setdefault(normalize_filename(new_filename), []).append(new_filename)
+        results.append(new_filename)
+    return results
+
 def check_sensitive_word(filename):
     """
     检查文件名中是否包含敏感词
@@ -76,6 +76,49 @@ def test_blacklist_functionality():
         config.path_blacklist = original_blacklist
         config.path_blacklist_keywords = original_keywords
 
+def test_keyword_pattern_follows_config_changes():
+    """关键词列表被替换后，预编译的关键词正则应随之更新"""
+    original_blacklist = config.path_blacklist
+    original_keywords = config.path_blacklist_keywords
+
+    try:
+        base_dir = os.getcwd()
+        config.path_blacklist = []
+
+        config.path_blacklist_keywords = ["[weibo]"]
+        assert config.is_path_blacklisted(os.path.join(base_dir, "A [WEIBO] B"))
+        assert not config.is_path_blacklisted(os.path.join(base_dir, "A [bili] B"))
+
+        config.path_blacklist_keywords = ["[bili]"]
+        assert config.is_path_blacklisted(os.path.join(base_dir, "A [Bili] B"))
+        assert not config.is_path_blacklisted(os.path.join(base_dir, "A [WEIBO] B"))
+
+        config.path_blacklist_keywords = []
+        assert not config.is_path_blacklisted(os.path.join(base_dir, "A [bili] B"))
+    finally:
+        config.path_blacklist = original_blacklist
+        config.path_blacklist_keywords = original_keywords
+
+def test_path_prefix_does_not_match_sibling():
+    """前缀匹配只命中黑名单目录本身及其子目录，不命中同名前缀的兄弟目录"""
+    original_blacklist = config.path_blacklist
+    original_keywords = config.path_blacklist_keywords
+
+    try:
+        base_dir = os.getcwd()
+        config.path_blacklist_keywords = []
+        config.path_blacklist = [os.path.join(base_dir, "blocked")]
+
+        assert config.is_path_blacklisted(os.path.join(base_dir, "blocked"))
+        assert config.is_path_blacklisted(os.path.join(base_dir, "blocked", "sub"))
+        assert not config.is_path_blacklisted(os.path.join(base_dir, "blocked_other"))
+
+        config.path_blacklist = [os.path.join(base_dir, "other")]
+        assert not config.is_path_blacklisted(os.path.join(base_dir, "blocked"))
+    finally:
+        config.path_blacklist = original_blacklist
+        config.path_blacklist_keywords = original_keywords
+
 if __name__ == "__main__":
     try:
         test_blacklist_functionality()
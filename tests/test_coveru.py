@@ -0,0 +1,53 @@
+import os
+import sys
+import zipfile
+
+import pytest
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from coveru import __main__ as coveru
+
+
+def _make_zip(path, size=16):
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr("01.png", b"x" * size)
+
+
+def _symlink_dir(target, link):
+    try:
+        os.symlink(target, link, target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("无法创建符号链接")
+
+
+def test_process_folder_handles_symlinked_subfolder(tmp_path):
+    """指向目录的符号链接子文件夹仍作为子文件夹处理，写入封面"""
+    root = tmp_path / "root"
+    real = tmp_path / "real"
+    (root / "sub1").mkdir(parents=True)
+    real.mkdir()
+    _make_zip(root / "sub1" / "a.zip")
+    _make_zip(real / "b.zip")
+    _symlink_dir(real, root / "sub2")
+
+    coveru.process_folder(str(root), no_convert=True)
+
+    assert (root / "sub1" / "(#cover)(sub1).png").exists()
+    assert (root / "sub2" / "(#cover)(sub2).png").exists()
+
+
+def test_get_largest_zip_does_not_descend_into_symlinks(tmp_path):
+    """递归查找压缩包时不进入指向目录的符号链接"""
+    folder = tmp_path / "folder"
+    outside = tmp_path / "outside"
+    folder.mkdir()
+    outside.mkdir()
+    _make_zip(folder / "small.zip", size=16)
+    _make_zip(outside / "large.zip", size=4096)
+    _symlink_dir(outside, folder / "link")
+
+    expected = str(folder / "small.zip")
+    assert coveru.get_largest_zip(str(folder)) == expected
+    assert coveru.get_largest_zip(str(folder), coveru._scan_folder(str(folder))) == expected
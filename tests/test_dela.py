@@ -0,0 +1,19 @@
+import os
+import sys
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from dela.__main__ import find_archives
+
+
+def test_find_archives_matches_configured_suffixes(tmp_path):
+    """archive_types 按后缀匹配：支持多段扩展名和不带点的写法，文件名不区分大小写"""
+    (tmp_path / "sub").mkdir()
+    for name in ["a.ZIP", "b.tar.gz", "c.rar", "notes.txt", "archive.gz"]:
+        (tmp_path / "sub" / name).write_bytes(b"")
+
+    archives = find_archives(str(tmp_path), {"archive_types": [".zip", ".tar.gz", "rar"]})
+
+    assert sorted(os.path.basename(path) for path in archives) == ["a.ZIP", "b.tar.gz", "c.rar"]
+    assert all(isinstance(path, str) for path in archives)
@@ -48,3 +48,17 @@ def test_various_size_prefixes():
     for filename, expected_part in cases:
         result = get_unique_filename(directory, filename, artist_name)
         assert expected_part in result
+
+def test_batch_unique_filenames(tmp_path):
+    """测试批量接口与单次调用结果一致，且批次内重名会被编号区分"""
+    from nameu.core.filename_processor import get_unique_filenames
+
+    artist_name = "None"
+    (tmp_path / "test [10P].zip").write_text("x")
+
+    cases = ["(57.1M) test.zip", "(10P) test.zip", "(10P) test.zip"]
+    results = get_unique_filenames(str(tmp_path), cases, artist_name)
+
+    assert results[0] == get_unique_filename(str(tmp_path), cases[0], artist_name)
+    assert results[1] == "test [10P] (1).zip"
+    assert results[2] == "test [10P] (2).zip"
@@ -0,0 +1,139 @@
+import os
+import sys
+
+import pytest
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from idset.core import IDSet, _fts_searchable
+
+
+@pytest.fixture
+def ids(tmp_path):
+    """临时数据库"""
+    return IDSet(str(tmp_path / "ids.db"))
+
+
+SAMPLE_RECORDS = [
+    ("[作者A] 漫画合集 第1卷.zip", "作者A"),
+    ("[作者A] 漫画合集 第2卷.zip", "作者A"),
+    ("[Artist B] Sample Book.cbz", "Artist B"),
+    ("[artist b] another_book.zip", "artist b"),
+    ("100%_complete.zip", "作者C"),
+    ("ab.zip", None),
+]
+
+QUERIES = [
+    {"file_name": "漫画合集"},
+    {"file_name": "Sample"},
+    {"file_name": "sample"},          # 大小写不敏感
+    {"file_name": "book"},
+    {"artist": "作者A"},
+    {"artist": "Artist", "file_name": "Book"},
+    {"file_name": "ab"},               # 少于3个字符（ASCII）
+    {"file_name": "z"},
+    {"artist": "作者"},                # 少于3个字符（非ASCII）
+    {"file_name": "第1"},
+    {"file_name": "100%"},             # LIKE 通配符
+    {"file_name": "_book"},
+    {"file_name": "不存在的记录"},
+    {},
+]
+
+
+def _uuids(records):
+    return sorted(record["uuid"] for record in records)
+
+
+def test_fts_searchable():
+    """trigram 索引只处理至少含3个连续字符、且没有短于3字符的非ASCII片段的子串"""
+    assert _fts_searchable("abc")
+    assert _fts_searchable("漫画合集")
+    assert not _fts_searchable("ab")
+    assert not _fts_searchable("作者")
+    assert not _fts_searchable("%%")
+    assert _fts_searchable("100%")
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_find_matches_like_search(ids, query):
+    """全文索引查询与原先的 LIKE 子串查询结果一致"""
+    if not ids.use_fts:
+        pytest.skip("SQLite 不支持 FTS5 trigram")
+    for file_name, artist in SAMPLE_RECORDS:
+        ids.add(file_name=file_name, artist=artist or "")
+
+    fts_result = ids.find(**query)
+    ids.use_fts = False
+    like_result = ids.find(**query)
+
+    assert _uuids(fts_result) == _uuids(like_result)
+
+
+def test_find_after_update_and_delete(ids):
+    """触发器让全文索引随记录的更新、删除同步"""
+    if not ids.use_fts:
+        pytest.skip("SQLite 不支持 FTS5 trigram")
+    uuid = ids.add(file_name="old_name.zip", artist="someone")
+    removed = ids.add(file_name="removed_name.zip", artist="someone")
+
+    ids.update(uuid, file_name="new_name.zip")
+    ids.delete(removed)
+
+    assert ids.find(file_name="old_name") == []
+    assert ids.find(file_name="removed_name") == []
+    assert _uuids(ids.find(file_name="new_name")) == [uuid]
+
+
+def test_fts_rebuilds_existing_records(tmp_path, ids):
+    """索引表不存在时，为已有记录重建索引"""
+    if not ids.use_fts:
+        pytest.skip("SQLite 不支持 FTS5 trigram")
+    uuid = ids.add(file_name="existing_record.zip", artist="someone")
+    with ids.engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE records_fts")
+
+    reopened = IDSet(str(tmp_path / "ids.db"))
+
+    assert reopened.use_fts
+    assert _uuids(reopened.find(file_name="existing")) == [uuid]
+
+
+def test_find_returns_expected_records(ids):
+    """全文索引查询的结果数量与预期一致"""
+    for file_name, artist in SAMPLE_RECORDS:
+        ids.add(file_name=file_name, artist=artist or "")
+
+    assert len(ids.find(file_name="漫画合集")) == 2
+    assert len(ids.find(file_name="sample")) == 1
+    assert len(ids.find(artist="Artist", file_name="Book")) == 2
+    assert len(ids.find(artist="作者")) == 3
+
+
+def test_add_many_with_duplicates(ids):
+    """批量添加时重复条目各自生成独立记录"""
+    items = [
+        {"file_name": "dup.zip", "artist": "someone"},
+        {"file_name": "dup.zip", "artist": "someone"},
+        {"file_name": "other.zip"},
+        {},
+    ]
+
+    uuids = ids.add_many(items)
+
+    assert len(uuids) == len(items)
+    assert len(set(uuids)) == len(items)
+    assert ids.count() == len(items)
+    assert ids.all_ids() == set(uuids)
+    assert len(ids.find(file_name="dup.zip")) == 2
+    assert ids.get(uuids[3])["file_name"] is None
+
+
+def test_add_many_matches_add(ids):
+    """add_many 写入的记录与逐条 add 的结果一致"""
+    single = ids.get(ids.add(file_name="a.zip", artist="someone"))
+    batch = ids.get(ids.add_many([{"file_name": "a.zip", "artist": "someone"}])[0])
+
+    assert (batch["file_name"], batch["artist"]) == (single["file_name"], single["artist"])
+    assert ids.add_many([]) == []